@@ -11,8 +11,8 @@ from pathlib import Path
 
 def check_python_version():
     """Check if Python version is compatible."""
-    if sys.version_info < (3, 8):
-        print("❌ Python 3.8+ required. Current version:", sys.version)
+    if sys.version_info < (3, 10):
+        print("❌ Python 3.10+ required. Current version:", sys.version)
         return False
     print(f"✅ Python {sys.version_info.major}.{sys.version_info.minor} detected")
     return True
@@ -44,8 +44,12 @@ def install_dependencies():
     """Install Python dependencies."""
     print("📦 Installing dependencies...")
     try:
-        subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"], 
-                      check=True, capture_output=True)
+        # Stream pip output straight to the terminal rather than buffering it
+        subprocess.run(
+            [sys.executable, "-m", "pip", "install", "--no-input", "--prefer-binary",
+             "-r", "requirements.txt"],
+            check=True
+        )
         print("✅ Dependencies installed successfully")
         return True
     except subprocess.CalledProcessError as e:
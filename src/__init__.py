@@ -1 +1,23 @@
 # SentientEcho - Reddit/Twitter Query Agent for SentientChat
+
+# Heavy classes are resolved on first attribute access (PEP 562) so that
+# importing the package does not load every provider up front.
+_LAZY_ATTRS = {
+    "SentientEchoAgent": ".sentient_echo_agent",
+    "EnhancedSentientServer": ".server",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        import importlib
+
+        module = importlib.import_module(_LAZY_ATTRS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_ATTRS))
@@ -1,85 +1,115 @@
 """Configuration management for SentientEcho agent."""
 
 import os
+from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Optional
-from pydantic import Field
-from pydantic_settings import BaseSettings
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+_TRUE_VALUES = frozenset({"1", "true", "t", "yes", "y", "on"})
+_FALSE_VALUES = frozenset({"0", "false", "f", "no", "n", "off"})
 
 
-class Settings(BaseSettings):
+def _env_str(name: str, default: Optional[str] = None):
+    """Return a factory reading a string environment variable."""
+    return lambda: os.getenv(name, default)
+
+
+def _env_int(name: str, default: int):
+    """Return a factory reading an integer environment variable."""
+    def read() -> int:
+        value = os.getenv(name)
+        return default if value is None or not value.strip() else int(value)
+    return read
+
+
+def _env_bool(name: str, default: bool):
+    """Return a factory reading a boolean environment variable."""
+    def read() -> bool:
+        value = os.getenv(name)
+        if value is None or not value.strip():
+            return default
+        value = value.strip().lower()
+        if value in _TRUE_VALUES:
+            return True
+        if value in _FALSE_VALUES:
+            return False
+        raise ValueError(f"Invalid boolean value for {name}: {value!r}")
+    return read
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
     """Application settings loaded from environment variables."""
     
     # Fireworks AI Configuration
-    fireworks_api_key: str = Field(..., env="FIREWORKS_API_KEY")
-    fireworks_model_id: str = Field(..., env="FIREWORKS_MODEL_ID")
+    fireworks_api_key: str = field(default_factory=_env_str("FIREWORKS_API_KEY", ""))
+    fireworks_model_id: str = field(default_factory=_env_str("FIREWORKS_MODEL_ID", ""))
     
     # Search API Configuration
-    serper_api_key: str = Field(..., env="SERPER_API_KEY")
-    jina_ai_api_key: str = Field(..., env="JINA_AI_API_KEY")
+    serper_api_key: str = field(default_factory=_env_str("SERPER_API_KEY", ""))
+    jina_ai_api_key: str = field(default_factory=_env_str("JINA_AI_API_KEY", ""))
     
     # Agent Configuration
-    agent_name: str = Field(default="SentientEcho", env="AGENT_NAME")
-    agent_port: int = Field(default=8000, env="AGENT_PORT")
-    agent_host: str = Field(default="0.0.0.0", env="AGENT_HOST")
+    agent_name: str = field(default_factory=_env_str("AGENT_NAME", "SentientEcho"))
+    agent_port: int = field(default_factory=_env_int("AGENT_PORT", 8000))
+    agent_host: str = field(default_factory=_env_str("AGENT_HOST", "0.0.0.0"))
     
     # Search Configuration
-    max_reddit_results: int = Field(default=10, env="MAX_REDDIT_RESULTS")
-    max_twitter_results: int = Field(default=10, env="MAX_TWITTER_RESULTS")
-    default_time_range_days: int = Field(default=7, env="DEFAULT_TIME_RANGE_DAYS")
-    enable_summaries: bool = Field(default=True, env="ENABLE_SUMMARIES")
+    max_reddit_results: int = field(default_factory=_env_int("MAX_REDDIT_RESULTS", 10))
+    max_twitter_results: int = field(default_factory=_env_int("MAX_TWITTER_RESULTS", 10))
+    default_time_range_days: int = field(default_factory=_env_int("DEFAULT_TIME_RANGE_DAYS", 7))
+    enable_summaries: bool = field(default_factory=_env_bool("ENABLE_SUMMARIES", True))
     
     # Logging Configuration
-    log_level: str = Field(default="INFO", env="LOG_LEVEL")
-    log_format: str = Field(default="json", env="LOG_FORMAT")
+    log_level: str = field(default_factory=_env_str("LOG_LEVEL", "INFO"))
+    log_format: str = field(default_factory=_env_str("LOG_FORMAT", "json"))
     
     # Optional Reddit API (backup)
-    reddit_client_id: Optional[str] = Field(default=None, env="REDDIT_CLIENT_ID")
-    reddit_client_secret: Optional[str] = Field(default=None, env="REDDIT_CLIENT_SECRET")
-    reddit_user_agent: str = Field(default="SentientEcho/1.0", env="REDDIT_USER_AGENT")
+    reddit_client_id: Optional[str] = field(default_factory=_env_str("REDDIT_CLIENT_ID"))
+    reddit_client_secret: Optional[str] = field(default_factory=_env_str("REDDIT_CLIENT_SECRET"))
+    reddit_user_agent: str = field(default_factory=_env_str("REDDIT_USER_AGENT", "SentientEcho/1.0"))
     
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-
-
-# Global settings instance
-settings = Settings()
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """Load variables from the .env file, then build settings from the environment."""
+        from dotenv import load_dotenv
+        
+        # Variables already present in the environment take precedence
+        load_dotenv()
+        return cls()
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    """Get the global settings instance."""
-    return settings
+    """Get the global settings instance, constructing it on first use."""
+    return Settings.from_env()
 
 
 # Validation
 def validate_config():
     """Validate that all required configuration is present."""
-    required_fields = [
-        "fireworks_api_key",
-        "fireworks_model_id",
-        "serper_api_key",
-        "jina_ai_api_key"
-    ]
+    s = get_settings()
+    if s.fireworks_api_key and s.fireworks_model_id and s.serper_api_key and s.jina_ai_api_key:
+        return True
     
-    missing_fields = []
-    for field in required_fields:
-        if not getattr(settings, field):
-            missing_fields.append(field.upper())
-    
-    if missing_fields:
-        raise ValueError(f"Missing required environment variables: {', '.join(missing_fields)}")
-    
-    return True
+    # Only work out which variables are missing once validation has failed
+    missing_fields = [
+        name.upper() for name, value in (
+            ("fireworks_api_key", s.fireworks_api_key),
+            ("fireworks_model_id", s.fireworks_model_id),
+            ("serper_api_key", s.serper_api_key),
+            ("jina_ai_api_key", s.jina_ai_api_key),
+        )
+        if not value
+    ]
+    raise ValueError(f"Missing required environment variables: {', '.join(missing_fields)}")
 
 
 if __name__ == "__main__":
     # Test configuration loading
     try:
         validate_config()
+        settings = get_settings()
         print("✅ Configuration loaded successfully!")
         print(f"Agent: {settings.agent_name}")
         print(f"Port: {settings.agent_port}")
@@ -4,26 +4,38 @@ Main entry point for SentientEcho agent.
 
 import asyncio
 import sys
-from sentient_agent_framework import DefaultServer
 
 try:
-    from .sentient_echo_agent import SentientEchoAgent
     from .config import get_settings, validate_config
     from .utils.logger import get_logger
-    from .server import EnhancedSentientServer
 except ImportError:
     # For direct execution/testing
     import sys
     import os
     sys.path.append(os.path.dirname(__file__))
-    from sentient_echo_agent import SentientEchoAgent
     from config import get_settings, validate_config
     from utils.logger import get_logger
-    from server import EnhancedSentientServer
 
 logger = get_logger(__name__)
 
 
+def _load_server_components():
+    """
+    Import the agent and server classes on demand.
+    
+    These pull in the providers and the agent framework, so they are only
+    loaded once a server is actually being built.
+    """
+    try:
+        from .sentient_echo_agent import SentientEchoAgent
+        from .server import EnhancedSentientServer
+    except ImportError:
+        # For direct execution/testing
+        from sentient_echo_agent import SentientEchoAgent
+        from server import EnhancedSentientServer
+    return SentientEchoAgent, EnhancedSentientServer
+
+
 async def main():
     """Main application entry point."""
     try:
@@ -34,6 +46,8 @@ async def main():
         settings = get_settings()
         logger.info(f"Configuration loaded successfully for {settings.agent_name}")
         
+        SentientEchoAgent, EnhancedSentientServer = _load_server_components()
+        
         # Create the agent
         agent = SentientEchoAgent(name=settings.agent_name)
         logger.info(f"Created {settings.agent_name} agent")
@@ -63,6 +77,7 @@ def run_server():
         validate_config()
         settings = get_settings()
 
+        SentientEchoAgent, EnhancedSentientServer = _load_server_components()
         agent = SentientEchoAgent(name=settings.agent_name)
         server = EnhancedSentientServer(agent)
 
@@ -73,6 +88,20 @@ def run_server():
         raise
 
 
+def _use_uvloop() -> bool:
+    """Switch asyncio to uvloop's C event loop when it is installed."""
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
 if __name__ == "__main__":
+    if _use_uvloop():
+        logger.info("Using uvloop event loop")
+    
     # Run the main function
     asyncio.run(main())
@@ -5,13 +5,18 @@ Data models for social media posts.
 from datetime import datetime
 from typing import Dict, Any, Optional
 from dataclasses import dataclass, field
+
+import orjson
 from pydantic import BaseModel
 
 
-@dataclass
+@dataclass(slots=True)
 class Post:
     """
     Unified data model for social media posts from Reddit and Twitter.
+    
+    Declared with ``slots=True`` so instances carry no per-instance
+    ``__dict__``; every attribute set on a post must be a field below.
     """
     id: str
     source: str  # "Reddit" or "Twitter"
@@ -24,15 +29,22 @@ class Post:
     summary: Optional[str] = None
     sentiment: Optional[str] = None
     relevance_score: Optional[float] = None
+    jina_relevance_score: Optional[float] = None
+    jina_metadata: Dict[str, Any] = field(default_factory=dict)
+    # ISO-8601 form of created_at, filled in lazily by to_dict()
+    _iso: Optional[str] = field(default=None, init=False, repr=False, compare=False)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert Post to dictionary for JSON serialization."""
+        if self._iso is None:
+            self._iso = self.created_at.isoformat()
+        
         return {
             "id": self.id,
             "source": self.source,
             "content": self.content,
             "author": self.author,
-            "created_at": self.created_at.isoformat(),
+            "created_at": self._iso,
             "url": self.url,
             "engagement_score": self.engagement_score,
             "metadata": self.metadata,
@@ -41,6 +53,16 @@ class Post:
             "relevance_score": self.relevance_score
         }
     
+    def to_json_bytes(self) -> bytes:
+        """
+        Serialize the Post to JSON bytes.
+        
+        orjson encodes the dataclass and its datetime natively, so no
+        intermediate dict or isoformat() string is built. Private fields are
+        skipped; the Jina fields are included alongside the to_dict() keys.
+        """
+        return orjson.dumps(self, option=orjson.OPT_UTC_Z)
+    
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "Post":
         """Create Post from dictionary."""
@@ -84,21 +106,25 @@ class Post:
         else:
             return f"Score: {self.engagement_score:.1f}"
     
-    def get_time_display(self) -> str:
-        """Get human-readable time display."""
-        now = datetime.now()
-        diff = now - self.created_at
+    def get_time_display(self, now: Optional[datetime] = None) -> str:
+        """
+        Get human-readable time display.
         
-        if diff.days > 0:
-            return f"{diff.days}d ago"
-        elif diff.seconds > 3600:
-            hours = diff.seconds // 3600
-            return f"{hours}h ago"
-        elif diff.seconds > 60:
-            minutes = diff.seconds // 60
-            return f"{minutes}m ago"
-        else:
-            return "Just now"
+        Args:
+            now: Reference time; pass one value when rendering many posts
+                to avoid reading the clock for each
+        """
+        if now is None:
+            now = datetime.now(self.created_at.tzinfo)
+        total = int((now - self.created_at).total_seconds())
+        
+        if total >= 86400:
+            return f"{total // 86400}d ago"
+        if total >= 3600:
+            return f"{total // 3600}h ago"
+        if total >= 60:
+            return f"{total // 60}m ago"
+        return "Just now"
 
 
 class ProcessedQuery(BaseModel):
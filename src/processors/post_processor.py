@@ -3,10 +3,17 @@ Post processor for ranking, filtering, and enhancing social media posts.
 """
 
 import asyncio
-from typing import List, Dict, Any
+import re
+import time
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import List, Dict, Any, Tuple
+
+import numpy as np
+
 try:
     from ..models.post import Post
-    from ..providers.ai_provider import AIProvider
+    from ..providers.ai_provider import AIProvider, SUMMARY_UNAVAILABLE
     from ..providers.jina_provider import JinaProvider, process_posts_with_jina
     from ..utils.logger import get_logger
 except ImportError:
@@ -15,12 +22,76 @@ except ImportError:
     import os
     sys.path.append(os.path.dirname(os.path.dirname(__file__)))
     from models.post import Post
-    from providers.ai_provider import AIProvider
+    from providers.ai_provider import AIProvider, SUMMARY_UNAVAILABLE
     from providers.jina_provider import JinaProvider, process_posts_with_jina
     from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Patterns used by duplicate detection, compiled once at import time
+_URL_RE = re.compile(r'https?://\S+')
+_TAG_RE = re.compile(r'[@#]\w+')
+_WORD_RE = re.compile(r'\w+')
+_url_sub = _URL_RE.sub
+_tag_sub = _TAG_RE.sub
+_find_words = _WORD_RE.findall
+
+# Minimum number of words, excluding links, mentions and hashtags, for a quality post
+_MIN_CONTENT_WORDS = 5
+
+# Maximum number of batched AI calls in flight when enhancing posts
+_ENHANCE_CONCURRENCY = 5
+
+# Posts summarized per AI call
+_ENHANCE_BATCH_SIZE = 8
+
+# Maximum number of (summary, sentiment) results kept for reuse
+_AI_CACHE_SIZE = 2048
+
+# Ranking bonus for post sentiment (prefer positive content slightly)
+_SENTIMENT_BONUS = {"positive": 0.1, "neutral": 0.05}
+
+
+# Posts whose SimHash fingerprints differ in at most this many bits are duplicates
+_SIMHASH_MAX_DISTANCE = 3
+
+
+def _fingerprint(normalized_content: str) -> int:
+    """Return a 64-bit fingerprint of normalized post content."""
+    digest = blake2b(normalized_content.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def _simhash(tokens: List[str]) -> int:
+    """
+    Return a 64-bit SimHash of the given tokens.
+    
+    Texts sharing most of their tokens get fingerprints that differ in only a
+    few bits, so near-duplicates can be found by Hamming distance.
+    """
+    counts = [0] * 64
+    for token in tokens:
+        h = _fingerprint(token)
+        for bit in range(64):
+            if h >> bit & 1:
+                counts[bit] += 1
+            else:
+                counts[bit] -= 1
+    
+    fp = 0
+    for bit, count in enumerate(counts):
+        if count > 0:
+            fp |= 1 << bit
+    return fp
+
+
+def _is_near_duplicate(fp: int, seen: List[int]) -> bool:
+    """Check whether a SimHash is within the duplicate distance of any seen one."""
+    for other in seen:
+        if (fp ^ other).bit_count() <= _SIMHASH_MAX_DISTANCE:
+            return True
+    return False
+
 
 class PostProcessor:
     """
@@ -31,6 +102,8 @@ class PostProcessor:
         """Initialize with AI provider and optional Jina provider for post analysis."""
         self.ai_provider = ai_provider
         self.jina_provider = jina_provider
+        # LRU of AI results keyed by (query, content fingerprint)
+        self._ai_cache: "OrderedDict[Tuple[str, int], Tuple[str, str]]" = OrderedDict()
         logger.info(f"Initialized PostProcessor with Jina: {jina_provider is not None}")
     
     async def process_posts(
@@ -56,19 +129,15 @@ class PostProcessor:
         try:
             logger.info(f"Processing {len(posts)} posts for query: {query}")
             
-            # Step 1: Remove duplicates
-            unique_posts = self._remove_duplicates(posts)
-            logger.info(f"After deduplication: {len(unique_posts)} posts")
+            # Steps 1-2: Remove duplicates and low-quality posts in one pass
+            kept_posts = self._dedup_and_filter(posts)
+            logger.info(f"After deduplication and quality filtering: {len(kept_posts)} posts")
             
-            # Step 2: Filter out low-quality posts
-            filtered_posts = self._filter_quality(unique_posts)
-            logger.info(f"After quality filtering: {len(filtered_posts)} posts")
-            
-            if not filtered_posts:
+            if not kept_posts:
                 return []
             
             # Step 3: Analyze posts in parallel
-            enhanced_posts = await self._enhance_posts_parallel(filtered_posts, query)
+            enhanced_posts = await self._enhance_posts_parallel(kept_posts, query)
             logger.info(f"Enhanced {len(enhanced_posts)} posts")
 
             # Step 4: Apply Jina AI processing if available
@@ -81,10 +150,10 @@ class PostProcessor:
                     logger.warning(f"Jina AI processing failed, continuing without: {e}")
 
             # Step 5: Rank by relevance and engagement
-            ranked_posts = self._rank_posts(enhanced_posts)
+            self._rank_posts(enhanced_posts)
             
-            # Step 5: Return top posts
-            result = ranked_posts[:max_posts]
+            # Step 6: Return top posts
+            result = enhanced_posts[:max_posts]
             logger.info(f"Returning top {len(result)} posts")
             
             return result
@@ -94,29 +163,48 @@ class PostProcessor:
             # Return original posts if processing fails
             return posts[:max_posts]
     
-    def _remove_duplicates(self, posts: List[Post]) -> List[Post]:
+    async def prefetch_enhancements(self, posts: List[Post], query: str) -> None:
         """
-        Remove duplicate posts based on content similarity.
+        Run AI analysis for one batch of posts ahead of process_posts.
+        
+        Results land in the AI cache, so a later process_posts call over a
+        larger set that includes these posts reuses them.
+        
+        Args:
+            posts: Posts from a single source
+            query: Original user query
+        """
+        kept_posts = self._dedup_and_filter(posts)
+        if kept_posts:
+            await self._enhance_posts_parallel(kept_posts, query)
+    
+    def _dedup_and_filter(self, posts: List[Post]) -> List[Post]:
+        """
+        Remove duplicate and low-quality posts in a single pass.
+        
+        Quality is checked first so rejected posts are never fingerprinted
+        and cannot shadow a later, better copy of the same content.
         
         Args:
             posts: List of posts
             
         Returns:
-            List of unique posts
+            List of unique, quality posts
         """
-        unique_posts = []
-        seen_content = set()
+        kept = []
+        seen: List[int] = []
         
         for post in posts:
-            # Create a normalized version of content for comparison
-            normalized_content = self._normalize_content(post.content)
+            if not self._is_quality_post(post):
+                continue
             
-            # Skip if we've seen very similar content
-            if normalized_content not in seen_content:
-                seen_content.add(normalized_content)
-                unique_posts.append(post)
+            fp = _simhash(_find_words(self._normalize_content(post.content)))
+            if _is_near_duplicate(fp, seen):
+                continue
+            seen.append(fp)
+            kept.append(post)
         
-        return unique_posts
+        return kept
     
     def _normalize_content(self, content: str) -> str:
         """
@@ -128,55 +216,46 @@ class PostProcessor:
         Returns:
             Normalized content string
         """
-        # Remove URLs, mentions, hashtags, and extra whitespace
-        import re
+        # Remove URLs, mentions and hashtags
+        content = _tag_sub('', _url_sub('', content))
         
-        # Remove URLs
-        content = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', content)
-        
-        # Remove mentions and hashtags
-        content = re.sub(r'[@#]\w+', '', content)
-        
-        # Remove extra whitespace and convert to lowercase
-        content = ' '.join(content.split()).lower()
-        
-        # Take first 100 characters for comparison
-        return content[:100]
+        # Collapse whitespace, lowercase and keep the first 100 characters
+        return ' '.join(content.split()).lower()[:100]
     
-    def _filter_quality(self, posts: List[Post]) -> List[Post]:
+    def _is_quality_post(self, post: Post) -> bool:
         """
-        Filter out low-quality posts.
+        Check whether a post meets the minimum quality bar.
         
         Args:
-            posts: List of posts
+            post: Post to check
             
         Returns:
-            List of quality posts
+            True if the post should be kept
         """
-        filtered_posts = []
+        # Skip very short posts
+        if len(post.content.strip()) < 20:
+            return False
         
-        for post in posts:
-            # Skip very short posts
-            if len(post.content.strip()) < 20:
-                continue
-            
-            # Skip posts with very low engagement
-            if post.engagement_score < 0:
-                continue
-            
-            # Skip posts that are mostly URLs or mentions
-            content_words = len([word for word in post.content.split() if not word.startswith(('http', '@', '#'))])
-            if content_words < 5:
-                continue
-            
-            filtered_posts.append(post)
+        # Skip posts with very low engagement
+        if post.engagement_score < 0:
+            return False
         
-        return filtered_posts
+        # Skip posts that are mostly URLs or mentions, stopping once enough words are seen
+        content_words = 0
+        for word in post.content.split():
+            if not word.startswith(('http', '@', '#')):
+                content_words += 1
+                if content_words >= _MIN_CONTENT_WORDS:
+                    return True
+        return False
     
     async def _enhance_posts_parallel(self, posts: List[Post], query: str) -> List[Post]:
         """
         Enhance posts with AI analysis in parallel.
         
+        Posts with cached results are filled in directly; the rest are
+        summarized in batches, one AI call per batch.
+        
         Args:
             posts: List of posts to enhance
             query: Original query for context
@@ -184,128 +263,123 @@ class PostProcessor:
         Returns:
             List of enhanced posts
         """
-        # Create tasks for parallel processing
-        tasks = []
-        
+        # Group uncached posts by content so duplicates share one analysis
+        pending: Dict[Tuple[str, int], List[Post]] = {}
         for post in posts:
-            task = self._enhance_single_post(post, query)
-            tasks.append(task)
-        
-        # Execute tasks in parallel with limited concurrency
-        semaphore = asyncio.Semaphore(5)  # Limit to 5 concurrent requests
+            key = (query, _fingerprint(self._normalize_content(post.content)))
+            cached = self._ai_cache.get(key)
+            if cached is not None:
+                self._ai_cache.move_to_end(key)
+                post.summary, post.sentiment = cached
+            else:
+                pending.setdefault(key, []).append(post)
         
-        async def bounded_enhance(post_task):
-            async with semaphore:
-                return await post_task
+        # Feed batches through a fixed pool of workers to limit concurrency
+        groups = list(pending.items())
+        queue: asyncio.Queue = asyncio.Queue()
+        for i in range(0, len(groups), _ENHANCE_BATCH_SIZE):
+            queue.put_nowait(groups[i:i + _ENHANCE_BATCH_SIZE])
         
-        enhanced_posts = await asyncio.gather(
-            *[bounded_enhance(task) for task in tasks],
-            return_exceptions=True
-        )
+        async def worker():
+            while True:
+                batch = await queue.get()
+                try:
+                    await self._enhance_batch(batch, query)
+                except Exception as e:
+                    logger.warning(f"Failed to enhance batch of {len(batch)} posts: {e}")
+                finally:
+                    queue.task_done()
         
-        # Filter out failed enhancements
-        result = []
-        for i, enhanced_post in enumerate(enhanced_posts):
-            if isinstance(enhanced_post, Exception):
-                logger.warning(f"Failed to enhance post {i}: {enhanced_post}")
-                result.append(posts[i])  # Use original post
-            else:
-                result.append(enhanced_post)
+        workers = [
+            asyncio.create_task(worker())
+            for _ in range(min(_ENHANCE_CONCURRENCY, queue.qsize()))
+        ]
+        try:
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
         
-        return result
+        return posts
     
-    async def _enhance_single_post(self, post: Post, query: str) -> Post:
+    async def _enhance_batch(self, batch: List[Tuple[Tuple[str, int], List[Post]]], query: str) -> None:
         """
-        Enhance a single post with AI analysis.
+        Summarize one batch of distinct post contents with a single AI call.
         
         Args:
-            post: Post to enhance
+            batch: (cache key, posts sharing that content) pairs
             query: Original query for context
-            
-        Returns:
-            Enhanced post
         """
-        try:
-            # Create tasks for parallel AI analysis
-            tasks = [
-                self.ai_provider.summarize_post(post.content, query),
-                self.ai_provider.analyze_sentiment(post.content)
-            ]
-            
-            # Execute AI tasks in parallel
-            summary, sentiment = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Handle results
-            if isinstance(summary, Exception):
-                logger.warning(f"Failed to generate summary: {summary}")
-                summary = None
-            
-            if isinstance(sentiment, Exception):
-                logger.warning(f"Failed to analyze sentiment: {sentiment}")
-                sentiment = "neutral"
-            
-            # Update post with enhancements
-            post.summary = summary
-            post.sentiment = sentiment
-            
-            return post
+        results = await self.ai_provider.summarize_and_sentiment_batch(
+            [group[0].content for _, group in batch], query
+        )
+        
+        for (key, group), (summary, sentiment) in zip(batch, results):
+            if summary != SUMMARY_UNAVAILABLE:
+                self._ai_cache[key] = (summary, sentiment)
+                if len(self._ai_cache) > _AI_CACHE_SIZE:
+                    self._ai_cache.popitem(last=False)
             
-        except Exception as e:
-            logger.error(f"Error enhancing post: {e}")
-            return post
+            for post in group:
+                post.summary = summary
+                post.sentiment = sentiment
     
     def _rank_posts(self, posts: List[Post]) -> List[Post]:
         """
         Rank posts by relevance and engagement.
         
+        Scores are computed over the whole batch at once with NumPy rather
+        than post by post, and the list is sorted in place.
+        
         Args:
             posts: List of posts to rank
             
         Returns:
-            List of ranked posts
+            The same list, sorted by relevance
         """
-        def calculate_score(post: Post) -> float:
-            """Calculate ranking score for a post."""
-            score = 0.0
-            
-            # Base engagement score (normalized)
-            max_engagement = max(p.engagement_score for p in posts) if posts else 1
-            engagement_factor = post.engagement_score / max_engagement if max_engagement > 0 else 0
-            score += engagement_factor * 0.4
-            
-            # Recency factor (newer posts get higher scores)
-            from datetime import datetime, timedelta
-            now = datetime.now()
-            age_hours = (now - post.created_at).total_seconds() / 3600
-            recency_factor = max(0, 1 - (age_hours / (24 * 7)))  # Decay over a week
-            score += recency_factor * 0.2
-            
-            # Content length factor (prefer substantial content)
-            content_length = len(post.content)
-            length_factor = min(1.0, content_length / 500)  # Optimal around 500 chars
-            score += length_factor * 0.2
-            
-            # Sentiment factor (prefer positive content slightly)
-            if post.sentiment == "positive":
-                score += 0.1
-            elif post.sentiment == "neutral":
-                score += 0.05
-            
-            # Source diversity bonus
-            if post.source == "Reddit":
-                score += 0.05  # Slight preference for Reddit due to discussion quality
-
-            # Jina AI relevance bonus (if available)
-            if hasattr(post, 'jina_relevance_score') and post.jina_relevance_score is not None:
-                score += post.jina_relevance_score * 0.3  # Weight Jina score
-
-            return score
+        if not posts:
+            return posts
         
-        # Calculate scores and sort
-        for post in posts:
-            post.relevance_score = calculate_score(post)
+        n = len(posts)
         
-        # Sort by relevance score (descending)
-        ranked_posts = sorted(posts, key=lambda p: p.relevance_score or 0, reverse=True)
+        # Gather the per-post inputs into contiguous arrays
+        engagement = np.fromiter((p.engagement_score for p in posts), dtype=np.float64, count=n)
+        created_ts = np.fromiter((p.created_at.timestamp() for p in posts), dtype=np.float64, count=n)
+        content_length = np.fromiter((len(p.content) for p in posts), dtype=np.float64, count=n)
+        sentiment_bonus = np.fromiter(
+            (_SENTIMENT_BONUS.get(p.sentiment, 0.0) for p in posts), dtype=np.float64, count=n
+        )
+        source_bonus = np.fromiter(
+            (0.05 if p.source == "Reddit" else 0.0 for p in posts), dtype=np.float64, count=n
+        )
+        jina_relevance = np.fromiter(
+            (p.jina_relevance_score or 0.0 for p in posts), dtype=np.float64, count=n
+        )
+        
+        # Base engagement score (normalized)
+        max_engagement = engagement.max()
+        engagement_factor = engagement / max_engagement if max_engagement > 0 else np.zeros(n)
+        
+        # Recency factor (newer posts get higher scores), decaying over a week
+        age_hours = (time.time() - created_ts) / 3600
+        recency_factor = np.clip(1 - age_hours / (24 * 7), 0.0, 1.0)
         
-        return ranked_posts
+        # Content length factor (prefer substantial content, optimal around 500 chars)
+        length_factor = np.minimum(1.0, content_length / 500)
+        
+        scores = (
+            engagement_factor * 0.4
+            + recency_factor * 0.2
+            + length_factor * 0.2
+            + sentiment_bonus     # Prefer positive content slightly
+            + source_bonus        # Slight preference for Reddit due to discussion quality
+            + jina_relevance * 0.3  # Jina AI relevance bonus (if available)
+        )
+        
+        for post, score in zip(posts, scores.tolist()):
+            post.relevance_score = score
+        
+        # Sort by relevance score (descending)
+        posts.sort(key=lambda p: p.relevance_score, reverse=True)
+        return posts
@@ -2,11 +2,15 @@
 Query processor for analyzing and preprocessing user queries.
 """
 
-from typing import Dict, Any, List
+import re
+from typing import Dict, Any, List, Optional
 try:
     from ..models.post import ProcessedQuery
     from ..providers.ai_provider import AIProvider
+    from ..providers.jina_provider import JinaProvider
+    from ..utils.cache import LRUCache, SemanticQueryCache
     from ..utils.logger import get_logger
+    from ..utils.text import STOPWORDS
 except ImportError:
     # For direct execution/testing
     import sys
@@ -14,20 +18,59 @@ except ImportError:
     sys.path.append(os.path.dirname(os.path.dirname(__file__)))
     from models.post import ProcessedQuery
     from providers.ai_provider import AIProvider
+    from providers.jina_provider import JinaProvider
+    from utils.cache import LRUCache, SemanticQueryCache
     from utils.logger import get_logger
+    from utils.text import STOPWORDS
 
 logger = get_logger(__name__)
 
+# Accepted values for the time range and sentiment filters
+_TIME_RANGES = frozenset({"day", "week", "month", "year"})
+_SENTIMENT_FILTERS = frozenset({"positive", "negative", "neutral", "any"})
+
+# Query type keywords in priority order; the first type with any match wins
+_QUERY_TYPE_KEYWORDS = (
+    ("sentiment_analysis", ("sentiment", "opinion", "think", "feel")),
+    ("trending_content", ("trending", "popular", "viral", "hot")),
+    ("news_search", ("news", "latest", "recent", "update")),
+    ("discussion_search", ("discussion", "debate", "conversation")),
+)
+
+
+def _keyword_group_pattern(groups) -> "re.Pattern":
+    """Compile (name, keywords) pairs into one alternation with a named group per name."""
+    return re.compile("|".join(
+        f"(?P<{name}>{'|'.join(map(re.escape, words))})" for name, words in groups
+    ))
+
+
+# Each pattern finds every keyword group present in a single scan of the query
+_QUERY_TYPE_RE = _keyword_group_pattern(_QUERY_TYPE_KEYWORDS)
+_PLATFORM_RE = _keyword_group_pattern((
+    ("reddit", ("reddit",)),  # also matches "subreddit"
+    ("twitter", ("twitter", "tweet")),
+))
+
+
+def _matched_groups(pattern: "re.Pattern", text: str) -> set:
+    """Return the names of the keyword groups found in text."""
+    return {match.lastgroup for match in pattern.finditer(text)}
+
 
 class QueryProcessor:
     """
     Processes user queries to extract search intent, keywords, and filters.
     """
     
-    def __init__(self, ai_provider: AIProvider):
-        """Initialize with AI provider for query analysis."""
+    def __init__(self, ai_provider: AIProvider, jina_provider: Optional[JinaProvider] = None):
+        """Initialize with AI provider and optional Jina provider for semantic caching."""
         self.ai_provider = ai_provider
-        logger.info("Initialized QueryProcessor")
+        self.jina_provider = jina_provider
+        self.semantic_cache = SemanticQueryCache()
+        # Processed queries by normalized prompt; an exact repeat skips the embedding and AI calls
+        self.processed_cache = LRUCache(max_size=2048, ttl_seconds=3600)
+        logger.info(f"Initialized QueryProcessor with semantic cache: {jina_provider is not None}")
     
     async def process_query(self, query: str) -> ProcessedQuery:
         """
@@ -39,11 +82,17 @@ class QueryProcessor:
         Returns:
             ProcessedQuery object with extracted information
         """
+        key = " ".join(query.lower().split())
+        cached = self.processed_cache.get(key)
+        if cached is not None:
+            logger.debug(f"Processed query cache hit: {query}")
+            return cached.model_copy(update={"original_query": query}, deep=True)
+        
         try:
             logger.info(f"Processing query: {query}")
             
             # Use AI to analyze the query
-            analysis = await self.ai_provider.process_query(query)
+            analysis = await self._analyze_query(query)
             
             # Extract and validate information
             keywords = self._extract_keywords(analysis.get("keywords", []), query)
@@ -64,6 +113,10 @@ class QueryProcessor:
             )
             
             logger.info(f"Processed query result: {processed_query.dict()}")
+            
+            # Fallback analyses are not cached so the next request retries the AI
+            if not analysis.get("fallback"):
+                self.processed_cache.set(key, processed_query.model_copy(deep=True))
             return processed_query
             
         except Exception as e:
@@ -71,6 +124,32 @@ class QueryProcessor:
             # Fallback to basic processing
             return self._fallback_processing(query)
     
+    async def _analyze_query(self, query: str) -> Dict[str, Any]:
+        """
+        Analyze a query, reusing the analysis of a semantically similar one if cached.
+        
+        Args:
+            query: The user's natural language query
+            
+        Returns:
+            AI analysis dictionary
+        """
+        embedding = None
+        if self.jina_provider:
+            embeddings = await self.jina_provider.get_embeddings([query])
+            if len(embeddings) == 1:
+                embedding = embeddings[0]
+                cached = self.semantic_cache.get(embedding)
+                if cached is not None:
+                    return cached
+        
+        analysis = await self.ai_provider.process_query(query)
+        
+        if embedding is not None and not analysis.get("fallback"):
+            self.semantic_cache.set(query, embedding, analysis)
+        
+        return analysis
+    
     def _extract_keywords(self, ai_keywords: List[str], original_query: str) -> List[str]:
         """
         Extract and validate keywords from AI analysis.
@@ -87,7 +166,7 @@ class QueryProcessor:
             # Filter out very short or common words
             filtered_keywords = [
                 kw for kw in ai_keywords 
-                if len(kw) > 2 and kw.lower() not in ["the", "and", "or", "but", "in", "on", "at", "to", "for", "of", "with", "by"]
+                if len(kw) > 2 and kw.lower() not in STOPWORDS
             ]
             
             if filtered_keywords:
@@ -107,30 +186,20 @@ class QueryProcessor:
         Returns:
             Dictionary of search filters
         """
-        filters = {}
+        time_range = analysis.get("time_range", "week")
+        sentiment = analysis.get("sentiment_filter", "any")
+        filters = {
+            "time_range": time_range if time_range in _TIME_RANGES else "week",
+            "sentiment": sentiment if sentiment in _SENTIMENT_FILTERS else "any"
+        }
         
-        # Subreddit filter
+        # Subreddit filter, cleaned of any r/ prefix
         subreddit = analysis.get("subreddit")
         if subreddit and isinstance(subreddit, str):
-            # Clean subreddit name
             subreddit = subreddit.replace("r/", "").replace("/", "")
             if subreddit:
                 filters["subreddit"] = subreddit
         
-        # Time range filter
-        time_range = analysis.get("time_range", "week")
-        if time_range in ["day", "week", "month", "year"]:
-            filters["time_range"] = time_range
-        else:
-            filters["time_range"] = "week"
-        
-        # Sentiment filter
-        sentiment = analysis.get("sentiment_filter", "any")
-        if sentiment in ["positive", "negative", "neutral", "any"]:
-            filters["sentiment"] = sentiment
-        else:
-            filters["sentiment"] = "any"
-        
         return filters
     
     def _fallback_processing(self, query: str) -> ProcessedQuery:
@@ -145,13 +214,18 @@ class QueryProcessor:
         """
         logger.warning("Using fallback query processing")
         
+        query_lower = query.lower()
+        
         # Simple keyword extraction
-        words = query.lower().split()
+        words = query_lower.split()
         keywords = [word for word in words if len(word) > 2][:5]
         
         # Detect platform preferences
-        search_reddit = "reddit" in query.lower() or "subreddit" in query.lower() or not ("twitter" in query.lower() or "tweet" in query.lower())
-        search_twitter = "twitter" in query.lower() or "tweet" in query.lower() or not ("reddit" in query.lower() or "subreddit" in query.lower())
+        platforms = _matched_groups(_PLATFORM_RE, query_lower)
+        mentions_reddit = "reddit" in platforms
+        mentions_twitter = "twitter" in platforms
+        search_reddit = mentions_reddit or not mentions_twitter
+        search_twitter = mentions_twitter or not mentions_reddit
         
         # If no platform specified, search both
         if not search_reddit and not search_twitter:
@@ -189,15 +263,9 @@ class QueryProcessor:
         Returns:
             Query type string
         """
-        query_lower = query.lower()
+        found = _matched_groups(_QUERY_TYPE_RE, query.lower())
         
-        if any(word in query_lower for word in ["sentiment", "opinion", "think", "feel"]):
-            return "sentiment_analysis"
-        elif any(word in query_lower for word in ["trending", "popular", "viral", "hot"]):
-            return "trending_content"
-        elif any(word in query_lower for word in ["news", "latest", "recent", "update"]):
-            return "news_search"
-        elif any(word in query_lower for word in ["discussion", "debate", "conversation"]):
-            return "discussion_search"
-        else:
-            return "general_search"
+        for query_type, _ in _QUERY_TYPE_KEYWORDS:
+            if query_type in found:
+                return query_type
+        return "general_search"
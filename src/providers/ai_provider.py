@@ -3,23 +3,115 @@ AI Provider for Sentient Dobby integration via Fireworks API.
 """
 
 import asyncio
-from typing import AsyncIterator, Dict, Any, List, Optional
+import copy
+import hashlib
+import itertools
+import re
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple
 import httpx
-from openai import AsyncOpenAI
-import json
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+import orjson
 import logging
 
 try:
+    from ..utils.http_client import client_options
     from ..utils.logger import get_logger
 except ImportError:
     # For direct execution/testing
     import sys
     import os
     sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+    from utils.http_client import client_options
     from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+_SENTIMENTS = ("positive", "negative", "neutral")
+
+# Summary returned when the model could not produce one
+SUMMARY_UNAVAILABLE = "Summary unavailable"
+
+# Maximum entries kept in the query analysis cache
+_QUERY_CACHE_SIZE = 1024
+
+# Posts scored per model call when ranking relevance
+_RANK_CHUNK_SIZE = 8
+
+# Characters of post content included in summary prompts
+_SUMMARY_CONTENT_CHARS = 1000
+
+# Completion tokens allowed per post for summary and sentiment output
+_SUMMARY_MAX_TOKENS = 200
+
+# Prompt templates built once; the fixed system messages form a shared prefix across calls
+_SUMMARY_SYSTEM_PROMPT = "You are an expert at summarizing social media content. Be concise and relevant."
+_SUMMARY_PROMPT = """
+        Summarize this social media post in relation to the user's query.
+        
+        User Query: "{query}"
+        Post Content: "{content}"
+        
+        Provide a 1-2 sentence summary that:
+        1. Explains how this post relates to the query
+        2. Captures the main sentiment/opinion
+        3. Highlights key points
+        
+        Keep it concise and relevant.
+        """
+
+_SUMMARY_SENTIMENT_SYSTEM_PROMPT = (
+    "You are an expert at summarizing social media content and analyzing sentiment. "
+    "Always respond with valid JSON."
+)
+_SUMMARY_SENTIMENT_PROMPT = """
+        Summarize this social media post in relation to the user's query and classify its sentiment.
+        
+        User Query: "{query}"
+        Post Content: "{content}"
+        
+        Please respond with a JSON object containing:
+        {{
+            "summary": "1-2 sentence summary explaining how the post relates to the query, its main opinion and key points",
+            "sentiment": "positive/negative/neutral"
+        }}
+        """
+
+_SUMMARY_SENTIMENT_BATCH_PROMPT = """
+        Summarize each of these social media posts in relation to the user's query and classify its sentiment.
+        
+        User Query: "{query}"
+        
+        Posts:
+        {posts}
+        
+        Please respond with a JSON array containing one object per post, in the same order as the posts:
+        [
+            {{
+                "summary": "1-2 sentence summary explaining how the post relates to the query, its main opinion and key points",
+                "sentiment": "positive/negative/neutral"
+            }}
+        ]
+        """
+
+# Body of the first markdown code fence, with an optional json tag
+_CODE_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)\s*(?:```|$)", re.DOTALL)
+
+
+def _parse_json_response(content: str) -> Any:
+    """Parse a JSON payload from model output, unwrapping a markdown code fence."""
+    match = _CODE_FENCE_RE.search(content)
+    return orjson.loads(match.group(1) if match else content)
+
+
+def _summary_and_sentiment(result: Dict[str, Any]) -> Tuple[str, str]:
+    """Read a validated (summary, sentiment) pair from one parsed model result."""
+    summary = str(result.get("summary") or "").strip() or SUMMARY_UNAVAILABLE
+    sentiment = str(result.get("sentiment") or "").strip().lower()
+    if sentiment not in _SENTIMENTS:
+        sentiment = "neutral"
+    return summary, sentiment
+
 
 class AIProvider:
     """
@@ -36,11 +128,37 @@ class AIProvider:
         # Initialize OpenAI client for Fireworks compatibility
         self.client = AsyncOpenAI(
             api_key=api_key,
-            base_url="https://api.fireworks.ai/inference/v1"
+            base_url="https://api.fireworks.ai/inference/v1",
+            http_client=DefaultAsyncHttpxClient(**client_options())
         )
         
+        # LRU cache of successful query analyses, keyed by a hash of model and query
+        self._query_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        
+        # Query analyses currently being requested, shared by identical concurrent queries
+        self._inflight: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+        
         logger.info(f"Initialized AI provider with model: {model_id}")
     
+    def _cache_key(self, *parts: str) -> str:
+        """Build a cache key from the model ID and the request inputs."""
+        return hashlib.sha256("\0".join((self.model_id,) + parts).encode()).hexdigest()
+    
+    @staticmethod
+    def _cache_get(cache: OrderedDict, key: str) -> Optional[Any]:
+        """Return a cached value and mark it as recently used."""
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+    
+    @staticmethod
+    def _cache_put(cache: OrderedDict, key: str, value: Any, max_size: int) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        cache[key] = value
+        if len(cache) > max_size:
+            cache.popitem(last=False)
+    
     async def process_query(self, query: str) -> Dict[str, Any]:
         """
         Process a natural language query to extract search intent and keywords.
@@ -48,6 +166,34 @@ class AIProvider:
         Args:
             query: The user's natural language query
             
+        Returns:
+            Dict containing processed query information
+        """
+        key = self._cache_key(query)
+        cached = self._cache_get(self._query_cache, key)
+        if cached is not None:
+            logger.debug(f"Query analysis cache hit: {query}")
+            return copy.deepcopy(cached)
+        
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._request_query_analysis(query, key))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            logger.debug(f"Joining in-flight query analysis: {query}")
+        
+        # Shield so a cancelled caller does not cancel the request for the others
+        return copy.deepcopy(await asyncio.shield(task))
+    
+    async def _request_query_analysis(self, query: str, key: str) -> Dict[str, Any]:
+        """
+        Ask the model to analyze a query and cache the result on success.
+        
+        Args:
+            query: The user's natural language query
+            key: Cache key for the query
+            
         Returns:
             Dict containing processed query information
         """
@@ -88,13 +234,9 @@ class AIProvider:
             content = response.choices[0].message.content.strip()
             
             # Extract JSON from response
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0].strip()
-            elif "```" in content:
-                content = content.split("```")[1].strip()
-            
-            result = json.loads(content)
+            result = _parse_json_response(content)
             logger.info(f"Processed query: {query} -> {result}")
+            self._cache_put(self._query_cache, key, result, _QUERY_CACHE_SIZE)
             return result
             
         except Exception as e:
@@ -107,7 +249,8 @@ class AIProvider:
                 "subreddit": None,
                 "time_range": "week",
                 "intent": query,
-                "sentiment_filter": "any"
+                "sentiment_filter": "any",
+                "fallback": True
             }
     
     async def summarize_post(self, post_content: str, query: str) -> str:
@@ -121,25 +264,13 @@ class AIProvider:
         Returns:
             A concise summary of the post
         """
-        prompt = f"""
-        Summarize this social media post in relation to the user's query.
-        
-        User Query: "{query}"
-        Post Content: "{post_content[:1000]}"
-        
-        Provide a 1-2 sentence summary that:
-        1. Explains how this post relates to the query
-        2. Captures the main sentiment/opinion
-        3. Highlights key points
-        
-        Keep it concise and relevant.
-        """
+        prompt = _SUMMARY_PROMPT.format(query=query, content=post_content[:_SUMMARY_CONTENT_CHARS])
         
         try:
             response = await self.client.chat.completions.create(
                 model=self.model_id,
                 messages=[
-                    {"role": "system", "content": "You are an expert at summarizing social media content. Be concise and relevant."},
+                    {"role": "system", "content": _SUMMARY_SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.4,
@@ -152,7 +283,7 @@ class AIProvider:
             
         except Exception as e:
             logger.error(f"Error generating summary: {e}")
-            return "Summary unavailable"
+            return SUMMARY_UNAVAILABLE
     
     async def analyze_sentiment(self, content: str) -> str:
         """
@@ -184,7 +315,7 @@ class AIProvider:
             )
             
             sentiment = response.choices[0].message.content.strip().lower()
-            if sentiment not in ["positive", "negative", "neutral"]:
+            if sentiment not in _SENTIMENTS:
                 sentiment = "neutral"
             
             return sentiment
@@ -193,6 +324,87 @@ class AIProvider:
             logger.error(f"Error analyzing sentiment: {e}")
             return "neutral"
     
+    async def summarize_and_sentiment(self, content: str, query: str) -> Tuple[str, str]:
+        """
+        Summarize a post and classify its sentiment with a single model call.
+        
+        Args:
+            content: The content of the post
+            query: The original user query for context
+            
+        Returns:
+            Tuple of (summary, sentiment) where sentiment is "positive",
+            "negative", or "neutral"
+        """
+        prompt = _SUMMARY_SENTIMENT_PROMPT.format(query=query, content=content[:_SUMMARY_CONTENT_CHARS])
+        
+        try:
+            response = await self.client.chat.completions.create(
+                model=self.model_id,
+                messages=[
+                    {"role": "system", "content": _SUMMARY_SENTIMENT_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.3,
+                max_tokens=_SUMMARY_MAX_TOKENS
+            )
+            
+            result = _parse_json_response(response.choices[0].message.content.strip())
+            summary, sentiment = _summary_and_sentiment(result)
+            
+            logger.debug(f"Generated summary for post: {summary}")
+            return summary, sentiment
+            
+        except Exception as e:
+            logger.error(f"Error summarizing post and analyzing sentiment: {e}")
+            return SUMMARY_UNAVAILABLE, "neutral"
+    
+    async def summarize_and_sentiment_batch(self, contents: List[str], query: str) -> List[Tuple[str, str]]:
+        """
+        Summarize several posts and classify their sentiment with a single model call.
+        
+        Falls back to one summarize_and_sentiment call per post if the batched
+        reply cannot be parsed or does not cover every post.
+        
+        Args:
+            contents: The contents of the posts
+            query: The original user query for context
+            
+        Returns:
+            (summary, sentiment) tuples in the same order as contents
+        """
+        if len(contents) < 2:
+            return [await self.summarize_and_sentiment(content, query) for content in contents]
+        
+        posts_text = "\n\n".join(
+            f"Post {i}: {content[:_SUMMARY_CONTENT_CHARS]}"
+            for i, content in enumerate(contents, 1)
+        )
+        prompt = _SUMMARY_SENTIMENT_BATCH_PROMPT.format(query=query, posts=posts_text)
+        
+        try:
+            response = await self.client.chat.completions.create(
+                model=self.model_id,
+                messages=[
+                    {"role": "system", "content": _SUMMARY_SENTIMENT_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.3,
+                max_tokens=_SUMMARY_MAX_TOKENS * len(contents)
+            )
+            
+            results = _parse_json_response(response.choices[0].message.content.strip())
+            if not isinstance(results, list) or len(results) != len(contents):
+                raise ValueError(f"expected {len(contents)} results")
+            
+            return [_summary_and_sentiment(result) for result in results]
+            
+        except Exception as e:
+            logger.warning(f"Batched summary failed, summarizing posts individually: {e}")
+            return list(await asyncio.gather(*(
+                self.summarize_and_sentiment(content, query) for content in contents
+            )))
+    
     async def rank_posts_relevance(self, posts: List[Dict], query: str) -> List[float]:
         """
         Rank posts by relevance to the query.
@@ -207,7 +419,22 @@ class AIProvider:
         if not posts:
             return []
         
-        # Create a batch prompt for efficiency
+        # Score small batches concurrently so long result sets don't truncate the reply
+        chunks = [posts[i:i + _RANK_CHUNK_SIZE] for i in range(0, len(posts), _RANK_CHUNK_SIZE)]
+        results = await asyncio.gather(*(self._rank_chunk(chunk, query) for chunk in chunks))
+        return list(itertools.chain.from_iterable(results))
+    
+    async def _rank_chunk(self, posts: List[Dict], query: str) -> List[float]:
+        """
+        Rank one batch of posts by relevance to the query in a single model call.
+        
+        Args:
+            posts: List of post dictionaries
+            query: The original query
+            
+        Returns:
+            List of relevance scores (0.0 to 1.0), 0.5 each if scoring fails
+        """
         posts_text = "\n\n".join([
             f"Post {i+1}: {post.get('content', '')[:200]}"
             for i, post in enumerate(posts)
@@ -232,7 +459,7 @@ class AIProvider:
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.2,
-                max_tokens=100
+                max_tokens=len(posts) * 8
             )
             
             scores_text = response.choices[0].message.content.strip()
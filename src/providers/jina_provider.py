@@ -2,24 +2,64 @@
 Jina AI Provider for content processing and enhancement.
 """
 
-import asyncio
+import hashlib
+from collections import Counter, OrderedDict
 from typing import List, Dict, Any, Optional
 import httpx
-import json
+import numpy as np
+import orjson
 
 try:
     from ..models.post import Post
+    from ..utils.http_client import get_shared_client
     from ..utils.logger import get_logger
+    from ..utils.text import STOPWORDS
 except ImportError:
     # For direct execution/testing
     import sys
     import os
     sys.path.append(os.path.dirname(os.path.dirname(__file__)))
     from models.post import Post
+    from utils.http_client import get_shared_client
     from utils.logger import get_logger
+    from utils.text import STOPWORDS
 
 logger = get_logger(__name__)
 
+# Maximum number of post embeddings kept between ranking calls
+_EMBEDDING_CACHE_SIZE = 4096
+
+# Characters of post content sent for embedding
+_EMBED_CONTENT_CHARS = 500
+
+
+def _normalize_rows(embeddings) -> np.ndarray:
+    """Scale each row to unit length, leaving zero rows as zeros."""
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def _relevance_scores(query_embedding, embeddings) -> np.ndarray:
+    """
+    Score each row of a matrix against one vector by cosine similarity.
+    
+    Rows are normalized up front so the whole batch is a single
+    matrix-vector product. Similarities are mapped to the 0-1 range, and
+    zero vectors score 0.
+    """
+    query = np.asarray(query_embedding, dtype=np.float32)
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    
+    query_norm = np.linalg.norm(query)
+    row_norms = np.linalg.norm(matrix, axis=1)
+    if query_norm == 0:
+        return np.zeros(len(matrix), dtype=np.float32)
+    
+    degenerate = row_norms == 0
+    similarities = (matrix @ query) / (np.where(degenerate, 1.0, row_norms) * query_norm)
+    return np.where(degenerate, 0.0, (similarities + 1) * 0.5)
+
 
 class JinaProvider:
     """
@@ -33,18 +73,23 @@ class JinaProvider:
         self.api_key = api_key
         self.base_url = "https://api.jina.ai/v1"
         
-        # HTTP client with timeout and retries
-        self.client = httpx.AsyncClient(
-            timeout=30.0,
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json"
-            }
-        )
+        # Credentials travel as per-request headers on the shared pooled client
+        self.headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        }
+        
+        # LRU of unit-length post embeddings, keyed by a hash of the embedded text
+        self._embedding_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
         
         logger.info("Initialized Jina AI provider")
     
-    async def get_embeddings(self, texts: List[str], model: str = "jina-embeddings-v3") -> List[List[float]]:
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared pooled HTTP client, looked up per use so a closed one is replaced."""
+        return get_shared_client()
+    
+    async def get_embeddings(self, texts: List[str], model: str = "jina-embeddings-v3") -> np.ndarray:
         """
         Get embeddings for a list of texts using Jina AI.
         
@@ -53,7 +98,7 @@ class JinaProvider:
             model: Jina embedding model to use
             
         Returns:
-            List of embedding vectors
+            float32 array with one embedding per row, empty on failure
         """
         try:
             payload = {
@@ -64,19 +109,20 @@ class JinaProvider:
             
             response = await self.client.post(
                 f"{self.base_url}/embeddings",
-                json=payload
+                content=orjson.dumps(payload),
+                headers=self.headers
             )
             response.raise_for_status()
             
-            data = response.json()
-            embeddings = [item["embedding"] for item in data["data"]]
+            data = orjson.loads(response.content)
+            embeddings = np.asarray([item["embedding"] for item in data["data"]], dtype=np.float32)
             
             logger.debug(f"Generated embeddings for {len(texts)} texts")
             return embeddings
             
         except Exception as e:
             logger.error(f"Error generating embeddings: {e}")
-            return []
+            return np.empty((0, 0), dtype=np.float32)
     
     async def calculate_similarity(self, text1: str, text2: str) -> float:
         """
@@ -89,28 +135,17 @@ class JinaProvider:
         Returns:
             Similarity score between 0 and 1
         """
+        if not text1 or not text2:
+            return 0.0
+        if text1 == text2:
+            return 1.0
+        
         try:
             embeddings = await self.get_embeddings([text1, text2])
             if len(embeddings) != 2:
                 return 0.0
             
-            # Calculate cosine similarity
-            import numpy as np
-            
-            vec1 = np.array(embeddings[0])
-            vec2 = np.array(embeddings[1])
-            
-            # Cosine similarity
-            dot_product = np.dot(vec1, vec2)
-            norm1 = np.linalg.norm(vec1)
-            norm2 = np.linalg.norm(vec2)
-            
-            if norm1 == 0 or norm2 == 0:
-                return 0.0
-            
-            similarity = dot_product / (norm1 * norm2)
-            # Convert to 0-1 range
-            return (similarity + 1) / 2
+            return float(_relevance_scores(embeddings[0], embeddings[1:2])[0])
             
         except Exception as e:
             logger.error(f"Error calculating similarity: {e}")
@@ -130,47 +165,46 @@ class JinaProvider:
         if not posts:
             return []
         
+        # Nothing to rank against, so skip the embedding request
+        if len(posts) == 1:
+            posts[0].jina_relevance_score = 1.0
+            return list(posts)
+        
         try:
-            # Prepare texts for embedding
-            texts = [query] + [post.content[:500] for post in posts]  # Limit content length
+            texts = [post.content[:_EMBED_CONTENT_CHARS] for post in posts]
+            keys = [hashlib.sha1(text.encode()).digest() for text in texts]
             
-            # Get embeddings
-            embeddings = await self.get_embeddings(texts)
-            if len(embeddings) != len(texts):
+            # Reuse embeddings of posts seen in earlier rankings
+            vectors = {}
+            for key in keys:
+                cached = self._embedding_cache.get(key)
+                if cached is not None:
+                    self._embedding_cache.move_to_end(key)
+                    vectors[key] = cached
+            missing = {key: text for key, text in zip(keys, texts) if key not in vectors}
+            
+            # Embed the query and only the posts not already cached
+            embeddings = await self.get_embeddings([query] + list(missing.values()))
+            if len(embeddings) != len(missing) + 1:
                 logger.warning("Embedding count mismatch, falling back to original order")
                 return posts
             
-            # Calculate similarities
-            import numpy as np
-            
-            query_embedding = np.array(embeddings[0])
-            post_embeddings = [np.array(emb) for emb in embeddings[1:]]
+            if missing:
+                for key, vector in zip(missing, _normalize_rows(embeddings[1:])):
+                    vectors[key] = vector
+                    self._embedding_cache[key] = vector
+                while len(self._embedding_cache) > _EMBEDDING_CACHE_SIZE:
+                    self._embedding_cache.popitem(last=False)
             
-            similarities = []
-            for post_emb in post_embeddings:
-                # Cosine similarity
-                dot_product = np.dot(query_embedding, post_emb)
-                norm_query = np.linalg.norm(query_embedding)
-                norm_post = np.linalg.norm(post_emb)
-                
-                if norm_query == 0 or norm_post == 0:
-                    similarity = 0.0
-                else:
-                    similarity = dot_product / (norm_query * norm_post)
-                    # Convert to 0-1 range
-                    similarity = (similarity + 1) / 2
-                
-                similarities.append(similarity)
+            # Cosine similarity of every post against the query in one pass
+            scores = _relevance_scores(embeddings[0], [vectors[key] for key in keys])
             
             # Update posts with Jina relevance scores
-            for i, post in enumerate(posts):
-                if i < len(similarities):
-                    post.jina_relevance_score = similarities[i]
-                else:
-                    post.jina_relevance_score = 0.0
+            for post, score in zip(posts, scores.tolist()):
+                post.jina_relevance_score = score
             
             # Sort by Jina relevance score
-            ranked_posts = sorted(posts, key=lambda p: getattr(p, 'jina_relevance_score', 0.0), reverse=True)
+            ranked_posts = sorted(posts, key=lambda p: p.jina_relevance_score or 0.0, reverse=True)
             
             logger.info(f"Ranked {len(posts)} posts using Jina AI embeddings")
             return ranked_posts
@@ -181,7 +215,10 @@ class JinaProvider:
     
     async def extract_keywords(self, text: str, max_keywords: int = 10) -> List[str]:
         """
-        Extract keywords from text using Jina AI.
+        Extract keywords from text.
+        
+        Extraction is done locally by word frequency; Jina has no keyword
+        endpoint, so no request is made. Kept async for existing callers.
         
         Args:
             text: Text to extract keywords from
@@ -190,58 +227,15 @@ class JinaProvider:
         Returns:
             List of extracted keywords
         """
-        try:
-            # Use Jina's text processing capabilities
-            payload = {
-                "model": "jina-reranker-v1-base-en",
-                "query": "extract important keywords",
-                "documents": [text[:1000]]  # Limit text length
-            }
-            
-            response = await self.client.post(
-                f"{self.base_url}/rerank",
-                json=payload
-            )
-            
-            if response.status_code == 200:
-                # For now, fall back to simple keyword extraction
-                # This could be enhanced with actual Jina keyword extraction
-                words = text.lower().split()
-                # Simple frequency-based keyword extraction
-                word_freq = {}
-                for word in words:
-                    if len(word) > 3 and word.isalpha():
-                        word_freq[word] = word_freq.get(word, 0) + 1
-                
-                keywords = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-                return [word for word, freq in keywords[:max_keywords]]
-            else:
-                # Fallback to simple extraction
-                return self._simple_keyword_extraction(text, max_keywords)
-                
-        except Exception as e:
-            logger.error(f"Error extracting keywords with Jina: {e}")
-            return self._simple_keyword_extraction(text, max_keywords)
+        return self._simple_keyword_extraction(text, max_keywords)
     
     def _simple_keyword_extraction(self, text: str, max_keywords: int) -> List[str]:
         """Simple fallback keyword extraction."""
-        words = text.lower().split()
-        word_freq = {}
-        
-        # Common stop words to filter out
-        stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 
-            'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'have', 
-            'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should',
-            'this', 'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they'
-        }
-        
-        for word in words:
-            if len(word) > 3 and word.isalpha() and word not in stop_words:
-                word_freq[word] = word_freq.get(word, 0) + 1
-        
-        keywords = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-        return [word for word, freq in keywords[:max_keywords]]
+        word_freq = Counter(
+            word for word in text.lower().split()
+            if len(word) > 3 and word.isalpha() and word not in STOPWORDS
+        )
+        return [word for word, _ in word_freq.most_common(max_keywords)]
     
     async def enhance_post_content(self, post: Post, query: str) -> Post:
         """
@@ -254,6 +248,9 @@ class JinaProvider:
         Returns:
             Enhanced post with additional metadata
         """
+        if post.jina_metadata.get('processed_by_jina') and post.jina_metadata.get('query') == query:
+            return post
+        
         try:
             # Calculate relevance score
             relevance = await self.calculate_similarity(post.content, query)
@@ -262,13 +259,11 @@ class JinaProvider:
             keywords = await self.extract_keywords(post.content, max_keywords=5)
             
             # Add Jina enhancements to post metadata
-            if not hasattr(post, 'jina_metadata'):
-                post.jina_metadata = {}
-            
             post.jina_metadata.update({
                 'relevance_score': relevance,
                 'extracted_keywords': keywords,
-                'processed_by_jina': True
+                'processed_by_jina': True,
+                'query': query
             })
             
             # Also set the jina_relevance_score attribute
@@ -280,16 +275,14 @@ class JinaProvider:
         except Exception as e:
             logger.error(f"Error enhancing post with Jina: {e}")
             return post
-    
-    async def close(self):
-        """Close the HTTP client."""
-        await self.client.aclose()
 
 
 # Utility function for batch processing
 async def process_posts_with_jina(posts: List[Post], query: str, jina_provider: JinaProvider) -> List[Post]:
     """
-    Process multiple posts with Jina AI in parallel.
+    Score, rank and annotate multiple posts with Jina AI.
+    
+    Posts not embedded before are embedded together with the query in one request.
     
     Args:
         posts: List of posts to process
@@ -303,21 +296,18 @@ async def process_posts_with_jina(posts: List[Post], query: str, jina_provider:
         return []
     
     try:
-        # Process posts in parallel
-        tasks = [jina_provider.enhance_post_content(post, query) for post in posts]
-        enhanced_posts = await asyncio.gather(*tasks, return_exceptions=True)
+        # Embed the query and all posts in a single request and rank locally
+        ranked_posts = await jina_provider.rank_posts_by_relevance(posts, query)
         
-        # Filter out exceptions and return successful results
-        result = []
-        for i, enhanced_post in enumerate(enhanced_posts):
-            if isinstance(enhanced_post, Exception):
-                logger.warning(f"Failed to enhance post {i}: {enhanced_post}")
-                result.append(posts[i])  # Use original post
-            else:
-                result.append(enhanced_post)
-        
-        # Rank by Jina relevance
-        ranked_posts = await jina_provider.rank_posts_by_relevance(result, query)
+        for post in ranked_posts:
+            if post.jina_relevance_score is None:
+                continue
+            post.jina_metadata.update({
+                'relevance_score': post.jina_relevance_score,
+                'extracted_keywords': jina_provider._simple_keyword_extraction(post.content, 5),
+                'processed_by_jina': True,
+                'query': query
+            })
         
         return ranked_posts
         
@@ -4,12 +4,14 @@ Reddit Provider for fetching posts using Pushshift.io API.
 
 import asyncio
 from typing import List, Optional, Dict, Any
-import httpx
 from datetime import datetime, timedelta
-import json
+import httpx
+import orjson
 
 try:
     from ..models.post import Post
+    from ..utils.cache import SearchCache
+    from ..utils.http_client import get_shared_client
     from ..utils.logger import get_logger
 except ImportError:
     # For direct execution/testing
@@ -17,10 +19,21 @@ except ImportError:
     import os
     sys.path.append(os.path.dirname(os.path.dirname(__file__)))
     from models.post import Post
+    from utils.cache import SearchCache
+    from utils.http_client import get_shared_client
     from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Look-back window for each supported time range, defaulting to a week
+_TIME_DELTAS = {
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+    "month": timedelta(days=30),
+    "year": timedelta(days=365),
+}
+_DEFAULT_TIME_DELTA = _TIME_DELTAS["week"]
+
 
 class RedditProvider:
     """
@@ -35,17 +48,25 @@ class RedditProvider:
         # Use Reddit's JSON API (no auth required for public posts)
         self.base_url = "https://www.reddit.com"
 
-        # HTTP client with timeout and retries
-        self.client = httpx.AsyncClient(
-            timeout=30.0,
-            limits=httpx.Limits(max_keepalive_connections=5, max_connections=10),
-            headers={
-                "User-Agent": "SentientEcho/1.0 (Reddit Search Bot)"
-            }
-        )
+        # Requests go through the shared pooled HTTP client with these headers
+        self.headers = {
+            "User-Agent": "SentientEcho/1.0 (Reddit Search Bot)"
+        }
+
+        # Search parameters that are the same for every request
+        self.search_url = f"{self.base_url}/search.json"
+        self.search_params = {"sort": "relevance", "limit": max_results}
+
+        # Recent search results, shared by identical concurrent searches
+        self.search_cache = SearchCache()
 
         logger.info(f"Initialized Reddit provider with max_results: {max_results}")
     
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared pooled HTTP client, looked up per use so a closed one is replaced."""
+        return get_shared_client()
+    
     async def search_posts(
         self,
         keywords: List[str],
@@ -65,46 +86,49 @@ class RedditProvider:
         Returns:
             List of Post objects
         """
+        key = f"{' '.join(sorted(keywords))}|{subreddit}|{time_range}|{min_score}"
+        return await self.search_cache.get_or_fetch(
+            key, lambda: self._search_posts(keywords, subreddit, time_range, min_score)
+        )
+    
+    async def _search_posts(
+        self,
+        keywords: List[str],
+        subreddit: Optional[str],
+        time_range: str,
+        min_score: int
+    ) -> List[Post]:
+        """Search Reddit posts without caching; see search_posts."""
         try:
             # Build search query
             query = " ".join(keywords)
 
+            params = {**self.search_params, "q": query, "t": time_range}
+
             # If subreddit specified, search within that subreddit
             if subreddit:
                 search_url = f"{self.base_url}/r/{subreddit}/search.json"
-                params = {
-                    "q": query,
-                    "restrict_sr": "on",  # Restrict to subreddit
-                    "sort": "relevance",
-                    "t": time_range,
-                    "limit": self.max_results
-                }
+                params["restrict_sr"] = "on"  # Restrict to subreddit
             else:
                 # Search all of Reddit
-                search_url = f"{self.base_url}/search.json"
-                params = {
-                    "q": query,
-                    "sort": "relevance",
-                    "t": time_range,
-                    "limit": self.max_results
-                }
+                search_url = self.search_url
 
             logger.info(f"Searching Reddit with query: {query}, subreddit: {subreddit}")
 
-            response = await self.client.get(search_url, params=params)
+            response = await self.client.get(search_url, params=params, headers=self.headers)
             response.raise_for_status()
 
-            data = response.json()
+            data = orjson.loads(response.content)
             posts = []
 
             if "data" in data and "children" in data["data"]:
                 for item in data["data"]["children"]:
                     try:
                         post_data = item.get("data", {})
-                        post = self._parse_reddit_post(post_data)
-                        if post and post.metadata.get("score", 0) >= min_score:
+                        post = self._parse_reddit_post(post_data, min_score)
+                        if post:
                             posts.append(post)
-                    except Exception as e:
+                    except (AttributeError, TypeError, ValueError) as e:
                         logger.warning(f"Error parsing Reddit post: {e}")
                         continue
 
@@ -115,78 +139,73 @@ class RedditProvider:
             logger.error(f"Error searching Reddit: {e}")
             return []
     
-    def _parse_reddit_post(self, item: Dict[str, Any]) -> Optional[Post]:
+    def _parse_reddit_post(self, item: Dict[str, Any], min_score: int = 0) -> Optional[Post]:
         """
         Parse a Reddit post from Pushshift API response.
         
         Args:
             item: Raw post data from API
+            min_score: Minimum score threshold
             
         Returns:
-            Post object or None if parsing fails
-        """
-        try:
-            # Combine title and selftext for content
-            title = item.get("title", "")
-            selftext = item.get("selftext", "")
-            content = f"{title}\n\n{selftext}".strip()
-            
-            # Skip if no meaningful content
-            if len(content.strip()) < 10:
-                return None
+            Post object, or None if the post scores below min_score or has no meaningful content
             
-            # Calculate engagement score
-            score = item.get("score", 0)
-            num_comments = item.get("num_comments", 0)
-            engagement_score = score + (num_comments * 0.5)  # Weight comments less than upvotes
-            
-            # Create Post object
-            post = Post(
-                id=item.get("id", ""),
-                source="Reddit",
-                content=content,
-                author=f"u/{item.get('author', 'unknown')}",
-                created_at=datetime.fromtimestamp(item.get("created_utc", 0)),
-                url=f"https://reddit.com{item.get('permalink', '')}",
-                engagement_score=engagement_score,
-                metadata={
-                    "subreddit": item.get("subreddit", ""),
-                    "score": score,
-                    "num_comments": num_comments,
-                    "title": title
-                }
-            )
-            
-            return post
-            
-        except Exception as e:
-            logger.error(f"Error parsing Reddit post: {e}")
+        Raises:
+            TypeError, ValueError: If a field has an unexpected type
+        """
+        get = item.get
+        
+        # Reject low-scoring posts before doing any other work
+        score = int(get("score") or 0)
+        if score < min_score:
+            return None
+        
+        # Combine title and selftext for content
+        title = get("title") or ""
+        selftext = get("selftext") or ""
+        if not title and not selftext:
+            return None
+        content = f"{title}\n\n{selftext}".strip()
+        
+        # Skip if no meaningful content
+        if len(content) < 10:
             return None
+        
+        # Calculate engagement score
+        num_comments = int(get("num_comments") or 0)
+        engagement_score = score + (num_comments * 0.5)  # Weight comments less than upvotes
+        
+        # Create Post object
+        post = Post(
+            id=get("id") or "",
+            source="Reddit",
+            content=content,
+            author="u/" + (get("author") or "unknown"),
+            created_at=datetime.fromtimestamp(get("created_utc") or 0),
+            url="https://reddit.com" + (get("permalink") or ""),
+            engagement_score=engagement_score,
+            metadata={
+                "subreddit": get("subreddit") or "",
+                "score": score,
+                "num_comments": num_comments,
+                "title": title
+            }
+        )
+        
+        return post
     
-    def _get_time_filter(self, time_range: str) -> int:
+    def _get_time_filter(self, time_range: str, now: Optional[datetime] = None) -> int:
         """
         Convert time range string to Unix timestamp.
         
         Args:
             time_range: Time range string (day, week, month, year)
+            now: Reference time, defaults to the current time
             
         Returns:
             Unix timestamp for the start of the time range
         """
-        now = datetime.now()
-        
-        if time_range == "day":
-            delta = timedelta(days=1)
-        elif time_range == "week":
-            delta = timedelta(weeks=1)
-        elif time_range == "month":
-            delta = timedelta(days=30)
-        elif time_range == "year":
-            delta = timedelta(days=365)
-        else:
-            delta = timedelta(weeks=1)  # Default to week
-        
-        start_time = now - delta
+        start_time = (now or datetime.now()) - _TIME_DELTAS.get(time_range, _DEFAULT_TIME_DELTA)
         return int(start_time.timestamp())
     
     async def get_post_comments(self, post_id: str, limit: int = 5) -> List[Dict[str, Any]]:
@@ -210,10 +229,10 @@ class RedditProvider:
                 "fields": "id,body,author,created_utc,score"
             }
             
-            response = await self.client.get(url, params=params)
+            response = await self.client.get(url, params=params, headers=self.headers)
             response.raise_for_status()
             
-            data = response.json()
+            data = orjson.loads(response.content)
             comments = []
             
             if "data" in data:
@@ -232,7 +251,3 @@ class RedditProvider:
         except Exception as e:
             logger.error(f"Error fetching comments for post {post_id}: {e}")
             return []
-    
-    async def close(self):
-        """Close the HTTP client."""
-        await self.client.aclose()
@@ -3,16 +3,23 @@ Twitter Provider for fetching tweets using multiple methods.
 """
 
 import asyncio
-import subprocess
-import json
+import itertools
 import httpx
-from typing import List, Optional, Dict, Any
+from typing import Any, Dict, List, Optional
 from datetime import datetime, timedelta
-import tempfile
 import os
 
+try:
+    from snscrape.modules.twitter import TwitterSearchScraper, TwitterUserScraper
+    SNSCRAPE_AVAILABLE = True
+except ImportError:
+    TwitterSearchScraper = TwitterUserScraper = None
+    SNSCRAPE_AVAILABLE = False
+
 try:
     from ..models.post import Post
+    from ..utils.cache import SearchCache
+    from ..utils.http_client import get_shared_client
     from ..utils.logger import get_logger
 except ImportError:
     # For direct execution/testing
@@ -20,10 +27,24 @@ except ImportError:
     import os
     sys.path.append(os.path.dirname(os.path.dirname(__file__)))
     from models.post import Post
+    from utils.cache import SearchCache
+    from utils.http_client import get_shared_client
     from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Seconds to wait for an snscrape scrape before giving up
+_SNSCRAPE_TIMEOUT = 60.0
+
+# Look-back window for each supported time range, defaulting to a week
+_TIME_DELTAS = {
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+    "month": timedelta(days=30),
+    "year": timedelta(days=365),
+}
+_DEFAULT_TIME_DELTA = _TIME_DELTAS["week"]
+
 
 class TwitterProvider:
     """
@@ -37,20 +58,23 @@ class TwitterProvider:
         self.max_results = max_results
         self.serper_api_key = serper_api_key
 
-        # HTTP client for Serper.dev API
+        # Serper.dev requests go through the shared pooled HTTP client with these headers
         if serper_api_key:
-            self.client = httpx.AsyncClient(
-                timeout=30.0,
-                headers={
-                    "X-API-KEY": serper_api_key,
-                    "Content-Type": "application/json"
-                }
-            )
-        else:
-            self.client = None
+            self.serper_headers = {
+                "X-API-KEY": serper_api_key,
+                "Content-Type": "application/json"
+            }
+
+        # Recent search results, shared by identical concurrent searches
+        self.search_cache = SearchCache()
 
         logger.info(f"Initialized Twitter provider with max_results: {max_results}")
     
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared pooled HTTP client, looked up per use so a closed one is replaced."""
+        return get_shared_client()
+    
     async def search_posts(
         self,
         keywords: List[str],
@@ -68,8 +92,15 @@ class TwitterProvider:
         Returns:
             List of Post objects
         """
+        key = f"{' '.join(sorted(keywords))}|{time_range}|{min_likes}"
+        return await self.search_cache.get_or_fetch(
+            key, lambda: self._search_posts(keywords, time_range, min_likes)
+        )
+    
+    async def _search_posts(self, keywords: List[str], time_range: str, min_likes: int) -> List[Post]:
+        """Search Twitter posts without caching; see search_posts."""
         # Try Serper.dev first if available
-        if self.client and self.serper_api_key:
+        if self.serper_api_key:
             try:
                 return await self._search_with_serper(keywords, time_range, min_likes)
             except Exception as e:
@@ -100,7 +131,8 @@ class TwitterProvider:
 
             response = await self.client.post(
                 "https://google.serper.dev/search",
-                json=search_data
+                json=search_data,
+                headers=self.serper_headers
             )
             response.raise_for_status()
 
@@ -114,7 +146,7 @@ class TwitterProvider:
                         post = self._parse_serper_result(result)
                         if post:
                             posts.append(post)
-                    except Exception as e:
+                    except (AttributeError, TypeError, ValueError) as e:
                         logger.warning(f"Error parsing Serper result: {e}")
                         continue
 
@@ -139,41 +171,12 @@ class TwitterProvider:
             # Add time filter
             since_date = self._get_since_date(time_range)
 
-            # Build snscrape command
+            # Build snscrape search query
             search_query = f'"{query}" since:{since_date} min_faves:{min_likes}'
 
-            cmd = [
-                "snscrape",
-                "--jsonl",
-                "--max-results", str(self.max_results),
-                "twitter-search",
-                search_query
-            ]
-
             logger.info(f"Searching Twitter with snscrape query: {search_query}")
 
-            # Execute snscrape command
-            result = await self._run_snscrape_command(cmd)
-
-            if not result:
-                logger.warning("No Twitter results returned from snscrape")
-                return []
-
-            # Parse results
-            posts = []
-            for line in result.strip().split('\n'):
-                if line.strip():
-                    try:
-                        tweet_data = json.loads(line)
-                        post = self._parse_twitter_post(tweet_data)
-                        if post:
-                            posts.append(post)
-                    except json.JSONDecodeError as e:
-                        logger.warning(f"Error parsing Twitter JSON: {e}")
-                        continue
-                    except Exception as e:
-                        logger.warning(f"Error processing Twitter post: {e}")
-                        continue
+            posts = await self._scrape_posts(TwitterSearchScraper, search_query, self.max_results, min_likes)
 
             logger.info(f"Found {len(posts)} Twitter posts via snscrape")
             return posts
@@ -182,127 +185,109 @@ class TwitterProvider:
             logger.error(f"Error searching Twitter via snscrape: {e}")
             return []
     
-    async def _run_snscrape_command(self, cmd: List[str]) -> Optional[str]:
+    async def _scrape_posts(self, scraper_class: Any, target: str, limit: int, min_likes: int = 0) -> List[Post]:
         """
-        Run snscrape command asynchronously.
+        Scrape tweets with snscrape in a worker thread.
         
         Args:
-            cmd: Command list to execute
+            scraper_class: snscrape scraper class to run
+            target: Search query or username passed to the scraper
+            limit: Maximum number of tweets to fetch
+            min_likes: Minimum likes threshold
             
         Returns:
-            Command output or None if failed
+            List of Post objects
         """
+        if not SNSCRAPE_AVAILABLE:
+            logger.warning("snscrape is not installed, skipping Twitter scrape")
+            return []
+        
         try:
-            # Run the command with timeout
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+            return await asyncio.wait_for(
+                asyncio.to_thread(self._collect_posts, scraper_class(target), limit, min_likes),
+                timeout=_SNSCRAPE_TIMEOUT
             )
-            
+        except asyncio.TimeoutError:
+            logger.error("snscrape scrape timed out")
+            return []
+    
+    def _collect_posts(self, scraper: Any, limit: int, min_likes: int) -> List[Post]:
+        """Drain up to limit tweets from a scraper into posts; runs off the event loop."""
+        posts = []
+        for tweet in itertools.islice(scraper.get_items(), limit):
             try:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(), 
-                    timeout=60.0  # 60 second timeout
-                )
-            except asyncio.TimeoutError:
-                process.kill()
-                await process.wait()
-                logger.error("snscrape command timed out")
-                return None
-            
-            if process.returncode != 0:
-                logger.error(f"snscrape command failed: {stderr.decode()}")
-                return None
-            
-            return stdout.decode()
-            
-        except Exception as e:
-            logger.error(f"Error running snscrape command: {e}")
-            return None
+                post = self._parse_twitter_post(tweet, min_likes)
+                if post:
+                    posts.append(post)
+            except (AttributeError, TypeError, ValueError) as e:
+                logger.warning(f"Error processing Twitter post: {e}")
+        return posts
     
-    def _parse_twitter_post(self, tweet_data: Dict[str, Any]) -> Optional[Post]:
+    def _parse_twitter_post(self, tweet: Any, min_likes: int = 0) -> Optional[Post]:
         """
-        Parse a Twitter post from snscrape output.
+        Parse a Twitter post from an snscrape tweet.
         
         Args:
-            tweet_data: Raw tweet data from snscrape
+            tweet: Tweet object yielded by an snscrape scraper
+            min_likes: Minimum likes threshold
             
         Returns:
-            Post object or None if parsing fails
+            Post object, or None if the tweet is a retweet, has too few likes or has no meaningful content
         """
-        try:
-            content = tweet_data.get("rawContent", tweet_data.get("content", ""))
-            
-            # Skip if no meaningful content
-            if len(content.strip()) < 10:
-                return None
-            
-            # Skip retweets to avoid duplicates
-            if content.startswith("RT @"):
-                return None
-            
-            # Calculate engagement score
-            likes = tweet_data.get("likeCount", 0)
-            retweets = tweet_data.get("retweetCount", 0)
-            replies = tweet_data.get("replyCount", 0)
-            engagement_score = likes + (retweets * 2) + (replies * 1.5)
-            
-            # Parse date
-            date_str = tweet_data.get("date", "")
-            try:
-                created_at = datetime.fromisoformat(date_str.replace("Z", "+00:00"))
-            except:
-                created_at = datetime.now()
-            
-            # Create Post object
-            post = Post(
-                id=str(tweet_data.get("id", "")),
-                source="Twitter",
-                content=content,
-                author=f"@{tweet_data.get('user', {}).get('username', 'unknown')}",
-                created_at=created_at,
-                url=tweet_data.get("url", ""),
-                engagement_score=engagement_score,
-                metadata={
-                    "likes": likes,
-                    "retweets": retweets,
-                    "replies": replies,
-                    "user_followers": tweet_data.get("user", {}).get("followersCount", 0),
-                    "user_verified": tweet_data.get("user", {}).get("verified", False)
-                }
-            )
-            
-            return post
-            
-        except Exception as e:
-            logger.error(f"Error parsing Twitter post: {e}")
+        content = getattr(tweet, "rawContent", None) or getattr(tweet, "content", "") or ""
+        
+        # Skip retweets to avoid duplicates, before any other work on the tweet
+        if content[:4] == "RT @":
+            return None
+        
+        # Skip if no meaningful content
+        if len(content) < 10 or len(content.strip()) < 10:
+            return None
+        
+        # Reject tweets below the likes threshold before building the post
+        likes = tweet.likeCount or 0
+        if likes < min_likes:
             return None
+        
+        # Calculate engagement score
+        retweets = tweet.retweetCount or 0
+        replies = tweet.replyCount or 0
+        engagement_score = likes + (retweets * 2) + (replies * 1.5)
+        
+        user = tweet.user
+        
+        # Create Post object
+        post = Post(
+            id=str(tweet.id),
+            source="Twitter",
+            content=content,
+            author=f"@{user.username if user else 'unknown'}",
+            created_at=tweet.date or datetime.now(),
+            url=tweet.url or "",
+            engagement_score=engagement_score,
+            metadata={
+                "likes": likes,
+                "retweets": retweets,
+                "replies": replies,
+                "user_followers": (user.followersCount or 0) if user else 0,
+                "user_verified": bool(user.verified) if user else False
+            }
+        )
+        
+        return post
     
-    def _get_since_date(self, time_range: str) -> str:
+    def _get_since_date(self, time_range: str, now: Optional[datetime] = None) -> str:
         """
         Convert time range string to date string for snscrape.
         
         Args:
             time_range: Time range string (day, week, month, year)
+            now: Reference time, defaults to the current time
             
         Returns:
             Date string in YYYY-MM-DD format
         """
-        now = datetime.now()
-        
-        if time_range == "day":
-            delta = timedelta(days=1)
-        elif time_range == "week":
-            delta = timedelta(weeks=1)
-        elif time_range == "month":
-            delta = timedelta(days=30)
-        elif time_range == "year":
-            delta = timedelta(days=365)
-        else:
-            delta = timedelta(weeks=1)  # Default to week
-        
-        since_date = now - delta
+        since_date = (now or datetime.now()) - _TIME_DELTAS.get(time_range, _DEFAULT_TIME_DELTA)
         return since_date.strftime("%Y-%m-%d")
     
     async def get_user_tweets(
@@ -321,32 +306,7 @@ class TwitterProvider:
             List of Post objects
         """
         try:
-            cmd = [
-                "snscrape",
-                "--jsonl",
-                "--max-results", str(limit),
-                "twitter-user",
-                username
-            ]
-            
-            result = await self._run_snscrape_command(cmd)
-            
-            if not result:
-                return []
-            
-            posts = []
-            for line in result.strip().split('\n'):
-                if line.strip():
-                    try:
-                        tweet_data = json.loads(line)
-                        post = self._parse_twitter_post(tweet_data)
-                        if post:
-                            posts.append(post)
-                    except Exception as e:
-                        logger.warning(f"Error processing user tweet: {e}")
-                        continue
-            
-            return posts
+            return await self._scrape_posts(TwitterUserScraper, username, limit)
             
         except Exception as e:
             logger.error(f"Error fetching user tweets for {username}: {e}")
@@ -360,65 +320,64 @@ class TwitterProvider:
             result: Search result from Serper API
 
         Returns:
-            Post object or None if parsing fails
+            Post object, or None if the result is not a meaningful tweet
         """
-        try:
-            title = result.get("title", "")
-            snippet = result.get("snippet", "")
-            link = result.get("link", "")
-
-            # Extract content (combine title and snippet)
-            content = f"{title}\n{snippet}".strip()
-
-            # Skip if no meaningful content
-            if len(content.strip()) < 10:
-                return None
-
-            # Skip if not a Twitter link
-            if "twitter.com" not in link and "x.com" not in link:
-                return None
-
-            # Extract username from link if possible
-            author = "unknown"
-            if "twitter.com/" in link or "x.com/" in link:
-                try:
-                    # Handle both twitter.com and x.com domains
-                    domain_part = link.split("twitter.com/")[1] if "twitter.com/" in link else link.split("x.com/")[1]
-                    username = domain_part.split("/")[0]
-                    author = f"@{username}"
-                except:
-                    pass
-
-            # Try to extract engagement hints from snippet
-            engagement_score = 50  # Default score
-            snippet_lower = snippet.lower()
-
-            # Look for engagement indicators in snippet
-            if any(word in snippet_lower for word in ["viral", "trending", "popular"]):
-                engagement_score += 30
-            if any(word in snippet_lower for word in ["likes", "retweets", "shares"]):
-                engagement_score += 20
-
-            # Create Post object with enhanced metadata
-            post = Post(
-                id=f"serper_{hash(link)}",
-                source="Twitter",
-                content=content,
-                author=author,
-                created_at=datetime.now(),  # Serper doesn't provide exact timestamps
-                url=link,
-                engagement_score=engagement_score,
-                metadata={
-                    "source_method": "serper",
-                    "title": title,
-                    "snippet": snippet,
-                    "estimated_engagement": True,
-                    "domain": "twitter.com" if "twitter.com" in link else "x.com"
-                }
-            )
+        get = result.get
+        title = get("title") or ""
+        snippet = get("snippet") or ""
 
-            return post
+        # Skip results too short to matter before building any strings
+        if len(title) + len(snippet) + 1 < 10:
+            return None
 
-        except Exception as e:
-            logger.error(f"Error parsing Serper result: {e}")
+        link = get("link") or ""
+
+        # Extract content (combine title and snippet)
+        content = f"{title}\n{snippet}".strip()
+
+        # Skip if no meaningful content
+        if len(content) < 10:
             return None
+
+        # Skip if not a Twitter link
+        if "twitter.com" not in link and "x.com" not in link:
+            return None
+
+        # Extract username from link if possible
+        author = "unknown"
+        # Handle both twitter.com and x.com domains
+        for domain in ("twitter.com/", "x.com/"):
+            _, found, path = link.partition(domain)
+            if found:
+                author = "@" + path.partition("/")[0]
+                break
+
+        # Try to extract engagement hints from snippet
+        engagement_score = 50  # Default score
+        snippet_lower = snippet.lower()
+
+        # Look for engagement indicators in snippet
+        if any(word in snippet_lower for word in ["viral", "trending", "popular"]):
+            engagement_score += 30
+        if any(word in snippet_lower for word in ["likes", "retweets", "shares"]):
+            engagement_score += 20
+
+        # Create Post object with enhanced metadata
+        post = Post(
+            id=f"serper_{hash(link)}",
+            source="Twitter",
+            content=content,
+            author=author,
+            created_at=datetime.now(),  # Serper doesn't provide exact timestamps
+            url=link,
+            engagement_score=engagement_score,
+            metadata={
+                "source_method": "serper",
+                "title": title,
+                "snippet": snippet,
+                "estimated_engagement": True,
+                "domain": "twitter.com" if "twitter.com" in link else "x.com"
+            }
+        )
+
+        return post
@@ -5,7 +5,7 @@ SentientEcho Agent - Main agent implementation for Reddit/Twitter query processi
 import logging
 import asyncio
 import time
-from typing import Dict, List, Any, Optional
+from typing import Awaitable, Dict, List, Any, Optional, Tuple
 from sentient_agent_framework import (
     AbstractAgent,
     Session,
@@ -40,6 +40,60 @@ except ImportError:
 
 logger = get_logger(__name__)
 
+# Seconds a single platform search may take before its results are dropped
+_SEARCH_TIMEOUT = 60.0
+
+# Markdown layout of the final response
+_RESPONSE_HEADER_TEMPLATE = "## 📊 Found {total} relevant posts\n\n"
+_POST_TEMPLATE = (
+    "### {i}. {source} Post\n"
+    "**Author**: {author}\n"
+    "**Posted**: {created_at}\n"
+    "**Engagement**: {engagement}\n\n"
+    "**Content**: {content}\n\n"
+    "{summary}"
+    "**Link**: {url}\n\n---\n\n"
+)
+_SUMMARY_TEMPLATE = "**AI Summary**: {summary}\n\n"
+
+
+class RecordingResponseHandler:
+    """
+    Response handler proxy that records text block and JSON events.
+    
+    Every call is forwarded to the wrapped handler unchanged; the recorded
+    events are what a cache hit replays.
+    """
+    
+    def __init__(self, handler: ResponseHandler):
+        self._handler = handler
+        self.events: List[Dict[str, Any]] = []
+    
+    async def emit_text_block(self, event_name: str, content: str):
+        self.events.append({"type": "text_block", "event_type": event_name, "content": content})
+        await self._handler.emit_text_block(event_name, content)
+    
+    async def emit_json(self, event_name: str, data: Dict[str, Any]):
+        self.events.append({"type": "json", "event_type": event_name, "data": data})
+        await self._handler.emit_json(event_name, data)
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._handler, name)
+
+
+async def _tagged_search(source: str, search: Awaitable[List[Any]]) -> Tuple[str, List[Any]]:
+    """Await a platform search, pairing its posts with the source name and logging failures."""
+    try:
+        return source, await search
+    except Exception as e:
+        logger.error("%s search failed: %r", source, e)
+        return source, []
+
+
+def _inflight_key(prompt: str) -> str:
+    """Normalize a prompt so trivially different spellings share one in-flight run."""
+    return " ".join(prompt.lower().split())
+
 
 class SentientEchoAgent(AbstractAgent):
     """
@@ -74,10 +128,13 @@ class SentientEchoAgent(AbstractAgent):
         )
 
         # Initialize processors
-        self.query_processor = QueryProcessor(self.ai_provider)
+        self.query_processor = QueryProcessor(self.ai_provider, self.jina_provider)
         self.post_processor = PostProcessor(self.ai_provider, self.jina_provider)
+
+        # Pipelines currently running, keyed by normalized prompt
+        self._inflight: Dict[str, asyncio.Future] = {}
         
-        logger.info(f"Initialized {name} agent with all providers")
+        logger.info("Initialized %s agent with all providers", name)
     
     async def assist(
         self,
@@ -94,193 +151,242 @@ class SentientEchoAgent(AbstractAgent):
             response_handler: Handler for emitting events to SentientChat
         """
         try:
-            logger.info(f"Processing query: {query.prompt}")
-
-            # Check cache first
-            cached_result = await get_cached_query_result(query.prompt)
-            if cached_result:
-                logger.info(f"Returning cached result for query: {query.prompt[:50]}...")
-
-                # Stream cached response
-                await response_handler.emit_text_block("CACHE_HIT", "⚡ Found cached result!")
-
-                # Emit cached events
-                for event in cached_result.get("events", []):
-                    if event["type"] == "text_block":
-                        await response_handler.emit_text_block(event["event_type"], event["content"])
-                    elif event["type"] == "json":
-                        await response_handler.emit_json(event["event_type"], event["data"])
+            logger.info("Processing query: %s", query.prompt)
 
-                # Stream final response
-                final_response = cached_result.get("final_response", "")
-                if final_response:
-                    stream = response_handler.create_text_stream("FINAL_RESPONSE")
-                    await stream.emit_chunk(final_response)
-                    await stream.complete()
+            # Check cache first, then join an identical query that is already running
+            cached_result = get_cached_query_result(query.prompt)
+            key = _inflight_key(query.prompt)
+            # A leader that finds nothing resolves to None; re-check so that
+            # waiters join whichever caller takes over instead of each rerunning
+            while not cached_result and key in self._inflight:
+                logger.info("Waiting for in-flight result for query: %.50s...", query.prompt)
+                cached_result = await asyncio.shield(self._inflight[key])
 
-                await response_handler.complete()
+            if cached_result:
+                logger.info("Returning cached result for query: %.50s...", query.prompt)
+                await self._emit_cached_result(cached_result, response_handler)
                 return
 
-            # Step 1: Process and understand the query
-            await response_handler.emit_text_block(
-                "QUERY_ANALYSIS", "🧠 Analyzing your query..."
-            )
-            
-            processed_query = await self.query_processor.process_query(query.prompt)
-            
-            await response_handler.emit_json(
-                "QUERY_INTENT", {
-                    "original_query": query.prompt,
-                    "processed_keywords": processed_query.keywords,
-                    "search_reddit": processed_query.search_reddit,
-                    "search_twitter": processed_query.search_twitter,
-                    "filters": processed_query.filters
-                }
-            )
-            
-            # Step 2: Search for content
-            await response_handler.emit_text_block(
-                "SEARCH", "🔍 Searching Reddit and Twitter for relevant posts..."
-            )
-            
-            # Parallel search execution
-            search_tasks = []
-            
-            if processed_query.search_reddit:
-                search_tasks.append(
-                    self.reddit_provider.search_posts(
-                        keywords=processed_query.keywords,
-                        subreddit=processed_query.filters.get("subreddit"),
-                        time_range=processed_query.filters.get("time_range", "week")
-                    )
-                )
-            
-            if processed_query.search_twitter:
-                search_tasks.append(
-                    self.twitter_provider.search_posts(
-                        keywords=processed_query.keywords,
-                        time_range=processed_query.filters.get("time_range", "week")
-                    )
-                )
-            
-            # Execute searches in parallel
-            search_results = await asyncio.gather(*search_tasks, return_exceptions=True)
-            
-            # Combine and process results
-            all_posts = []
-            reddit_posts = []
-            twitter_posts = []
-            
-            for i, result in enumerate(search_results):
-                if isinstance(result, Exception):
-                    logger.error(f"Search task {i} failed: {result}")
-                    continue
-                
-                if processed_query.search_reddit and i == 0:
-                    reddit_posts = result
-                    all_posts.extend(result)
-                elif processed_query.search_twitter:
-                    twitter_posts = result
-                    all_posts.extend(result)
-            
-            if not all_posts:
-                await response_handler.emit_text_block(
-                    "NO_RESULTS", "❌ No relevant posts found for your query."
-                )
-                await response_handler.complete()
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[key] = future
+            recorder = RecordingResponseHandler(response_handler)
+            cache_data = None
+            try:
+                cache_data = await self._run_pipeline(query, recorder)
+                if cache_data is not None:
+                    cache_data["events"] = recorder.events
+            finally:
+                future.set_result(cache_data)
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+            if cache_data is None:
                 return
-            
-            # Step 3: Process and rank posts
-            await response_handler.emit_text_block(
-                "PROCESSING", "⚡ Processing and ranking posts..."
-            )
-            
-            processed_posts = await self.post_processor.process_posts(
-                posts=all_posts,
-                query=query.prompt,
-                max_posts=10
-            )
-            
-            # Step 4: Emit results
-            if reddit_posts:
-                await response_handler.emit_json(
-                    "REDDIT_POSTS", {
-                        "source": "Reddit",
-                        "count": len(reddit_posts),
-                        "posts": [post.to_dict() for post in reddit_posts[:5]]
-                    }
-                )
-            
-            if twitter_posts:
-                await response_handler.emit_json(
-                    "TWITTER_POSTS", {
-                        "source": "Twitter", 
-                        "count": len(twitter_posts),
-                        "posts": [post.to_dict() for post in twitter_posts[:5]]
-                    }
-                )
-            
-            # Step 5: Generate final response with summaries
-            final_response_stream = response_handler.create_text_stream(
-                "FINAL_RESPONSE"
-            )
-            
-            await final_response_stream.emit_chunk(
-                f"## 📊 Found {len(all_posts)} relevant posts\n\n"
-            )
-            
-            # Stream the top posts with summaries
-            for i, post in enumerate(processed_posts[:5], 1):
-                await final_response_stream.emit_chunk(
-                    f"### {i}. {post.source} Post\n"
-                )
-                await final_response_stream.emit_chunk(
-                    f"**Author**: {post.author}\n"
-                )
-                await final_response_stream.emit_chunk(
-                    f"**Posted**: {post.created_at}\n"
-                )
-                await final_response_stream.emit_chunk(
-                    f"**Engagement**: {post.engagement_score}\n\n"
-                )
-                await final_response_stream.emit_chunk(
-                    f"**Content**: {post.content[:500]}{'...' if len(post.content) > 500 else ''}\n\n"
-                )
-                
-                if self.settings.enable_summaries and post.summary:
-                    await final_response_stream.emit_chunk(
-                        f"**AI Summary**: {post.summary}\n\n"
-                    )
-                
-                await final_response_stream.emit_chunk(
-                    f"**Link**: {post.url}\n\n---\n\n"
-                )
-            
-            # Complete the response
-            await final_response_stream.complete()
-            await response_handler.complete()
 
             # Cache the result for future queries
             try:
-                # Collect response data for caching
-                cache_data = {
-                    "events": [],  # Would need to collect events during processing
-                    "final_response": getattr(final_response_stream, 'content', ''),
-                    "processed_posts_count": len(processed_posts),
-                    "timestamp": time.time()
-                }
-                await cache_query_result(query.prompt, cache_data)
-                logger.debug(f"Cached result for query: {query.prompt[:50]}...")
+                cache_query_result(query.prompt, cache_data)
+                logger.debug("Cached result for query: %.50s...", query.prompt)
             except Exception as cache_error:
-                logger.warning(f"Failed to cache result: {cache_error}")
+                logger.warning("Failed to cache result: %s", cache_error)
 
-            logger.info(f"Successfully processed query with {len(processed_posts)} posts")
+            logger.info("Successfully processed query with %d posts", cache_data["processed_posts_count"])
             
         except Exception as e:
-            logger.error(f"Error processing query: {e}", exc_info=True)
+            logger.error("Error processing query: %s", e, exc_info=True)
             await response_handler.emit_error(
                 "PROCESSING_ERROR",
                 error_code="INTERNAL_ERROR",
                 details={"message": str(e)}
             )
             await response_handler.complete()
+    
+    async def _emit_cached_result(self, cached_result: Dict[str, Any], response_handler: ResponseHandler):
+        """
+        Replay a cached query result to the response handler.
+        
+        Args:
+            cached_result: Result stored by a previous run of the pipeline
+            response_handler: Handler for emitting events to SentientChat
+        """
+        # Stream cached response
+        await response_handler.emit_text_block("CACHE_HIT", "⚡ Found cached result!")
+
+        # Emit cached events
+        for event in cached_result.get("events", []):
+            if event["type"] == "text_block":
+                await response_handler.emit_text_block(event["event_type"], event["content"])
+            elif event["type"] == "json":
+                await response_handler.emit_json(event["event_type"], event["data"])
+
+        # Stream final response
+        final_response = cached_result.get("final_response", "")
+        if final_response:
+            stream = response_handler.create_text_stream("FINAL_RESPONSE")
+            await stream.emit_chunk(final_response)
+            await stream.complete()
+
+        await response_handler.complete()
+    
+    async def _run_pipeline(self, query: Query, response_handler: ResponseHandler) -> Optional[Dict[str, Any]]:
+        """
+        Analyze the query, search both platforms and stream the response.
+        
+        Args:
+            query: The user's query
+            response_handler: Handler for emitting events to SentientChat
+            
+        Returns:
+            Data to cache for the query, or None if no posts were found
+        """
+        # Step 1: Process and understand the query
+        await response_handler.emit_text_block(
+            "QUERY_ANALYSIS", "🧠 Analyzing your query..."
+        )
+        
+        processed_query = await self.query_processor.process_query(query.prompt)
+        
+        await response_handler.emit_json(
+            "QUERY_INTENT", {
+                "original_query": query.prompt,
+                "processed_keywords": processed_query.keywords,
+                "search_reddit": processed_query.search_reddit,
+                "search_twitter": processed_query.search_twitter,
+                "filters": processed_query.filters
+            }
+        )
+        
+        # Step 2: Search for content
+        await response_handler.emit_text_block(
+            "SEARCH", "🔍 Searching Reddit and Twitter for relevant posts..."
+        )
+        
+        # Parallel search execution, each platform bounded so a slow one cannot stall the other.
+        # Whichever platform answers first gets its posts analyzed while the other is still searching.
+        reddit_posts = []
+        twitter_posts = []
+        prefetches = []
+        
+        searches = [
+            _tagged_search(source, search)
+            for source, search in self._search_coroutines(processed_query).items()
+        ]
+        for search in asyncio.as_completed(searches):
+            source, result = await search
+            if source == "Reddit":
+                reddit_posts = result
+            else:
+                twitter_posts = result
+            if not result:
+                continue
+            
+            # Show each platform's posts as soon as they arrive; summaries follow in the final response
+            posts_event = {
+                "source": source,
+                "count": len(result),
+                "posts": [post.to_dict() for post in result[:5]]
+            }
+            prefetches.append(asyncio.ensure_future(
+                self.post_processor.prefetch_enhancements(result, query.prompt)
+            ))
+            await response_handler.emit_json(f"{source.upper()}_POSTS", posts_event)
+        
+        all_posts = reddit_posts + twitter_posts
+        
+        if not all_posts:
+            await response_handler.emit_text_block(
+                "NO_RESULTS", "❌ No relevant posts found for your query."
+            )
+            await response_handler.complete()
+            return None
+        
+        # Step 3: Process and rank posts
+        await response_handler.emit_text_block(
+            "PROCESSING", "⚡ Processing and ranking posts..."
+        )
+        
+        await asyncio.gather(*prefetches, return_exceptions=True)
+        processed_posts = await self.post_processor.process_posts(
+            posts=all_posts,
+            query=query.prompt,
+            max_posts=10
+        )
+        
+        # Step 4: Generate final response with summaries
+        final_response_stream = response_handler.create_text_stream(
+            "FINAL_RESPONSE"
+        )
+        
+        # Build the whole response up front and send it as a single chunk
+        final_response = self._format_final_response(len(all_posts), processed_posts[:5])
+        await final_response_stream.emit_chunk(final_response)
+        
+        # Complete the response
+        await final_response_stream.complete()
+        await response_handler.complete()
+
+        return {
+            "final_response": final_response,
+            "processed_posts_count": len(processed_posts),
+            "timestamp": time.time()
+        }
+    
+    def _search_coroutines(self, processed_query: Any) -> Dict[str, Awaitable[List[Any]]]:
+        """
+        Build the platform searches for a processed query.
+        
+        Args:
+            processed_query: ProcessedQuery describing keywords, platforms and filters
+            
+        Returns:
+            Awaitable searches keyed by source name
+        """
+        time_range = processed_query.filters.get("time_range", "week")
+        searches = {}
+        
+        if processed_query.search_reddit:
+            searches["Reddit"] = asyncio.wait_for(
+                self.reddit_provider.search_posts(
+                    keywords=processed_query.keywords,
+                    subreddit=processed_query.filters.get("subreddit"),
+                    time_range=time_range
+                ),
+                timeout=_SEARCH_TIMEOUT
+            )
+        
+        if processed_query.search_twitter:
+            searches["Twitter"] = asyncio.wait_for(
+                self.twitter_provider.search_posts(
+                    keywords=processed_query.keywords,
+                    time_range=time_range
+                ),
+                timeout=_SEARCH_TIMEOUT
+            )
+        
+        return searches
+    
+    def _format_final_response(self, total_posts: int, posts: List[Any]) -> str:
+        """
+        Render the top posts as the markdown final response.
+        
+        Args:
+            total_posts: Number of posts found across all platforms
+            posts: Posts to include in the response
+            
+        Returns:
+            Markdown text for the final response stream
+        """
+        show_summaries = self.settings.enable_summaries
+        parts = [_RESPONSE_HEADER_TEMPLATE.format(total=total_posts)]
+        for i, post in enumerate(posts, 1):
+            parts.append(_POST_TEMPLATE.format_map({
+                "i": i,
+                "source": post.source,
+                "author": post.author,
+                "created_at": post.created_at,
+                "engagement": post.engagement_score,
+                "content": post.get_display_content(500),
+                "summary": _SUMMARY_TEMPLATE.format(summary=post.summary) if show_summaries and post.summary else "",
+                "url": post.url,
+            }))
+        return "".join(parts)
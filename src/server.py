@@ -3,16 +3,19 @@ Enhanced server implementation with custom endpoints and rate limiting.
 """
 
 import asyncio
+import hashlib
 import time
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
-from collections import defaultdict, deque
-import json
+from typing import Dict, Any, List, Optional, Tuple
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 
 from fastapi import FastAPI, HTTPException, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
 from sentient_agent_framework import DefaultServer, Session, Query, ResponseHandler
+import orjson
 import uvicorn
 
 try:
@@ -24,6 +27,7 @@ try:
         security_monitor, CircuitBreaker
     )
     from .utils.cache import get_cache_stats
+    from .utils.http_client import close_shared_client
 except ImportError:
     # For direct execution/testing
     import sys
@@ -37,17 +41,93 @@ except ImportError:
         security_monitor, CircuitBreaker
     )
     from utils.cache import get_cache_stats
+    from utils.http_client import close_shared_client
 
 logger = get_logger(__name__)
 
+# Client identifier of the request being handled, set once per request by middleware
+_client_id_var: ContextVar[str] = ContextVar("client_id")
+
+
+class ORJSONResponse(Response):
+    """JSON response serialized with orjson."""
+    
+    media_type = "application/json"
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    """Release pooled provider connections when the app stops."""
+    yield
+    await close_shared_client()
+
+
+# Static /info payload, serialized once at import
+_AGENT_INFO = {
+    "name": "SentientEcho",
+    "description": "Answers any query using real Reddit and Twitter posts. Cuts through noise with actual public sentiment and AI summaries.",
+    "version": "1.0.0",
+    "capabilities": [
+        "Reddit Fetch",
+        "Twitter Fetch",
+        "Real Post Context",
+        "AI Summary",
+        "Query Filters",
+        "Sentiment Analysis",
+        "Relevance Ranking"
+    ],
+    "example_queries": [
+        "What do Redditors say about Coinbase's recent outage?",
+        "Latest Twitter sentiment on ETH ETFs?",
+        "Best subreddit discussions on productivity tools in 2025?",
+        "How is the gaming community reacting to GTA 6 leaks?",
+        "Python programming opinions on r/learnpython this week"
+    ],
+    "supported_filters": {
+        "subreddit": "Specific subreddit to search (e.g., 'MachineLearning')",
+        "time_range": "day, week, month, year",
+        "sentiment": "positive, negative, neutral, any"
+    },
+    "rate_limits": {
+        "requests_per_minute": 60,
+        "requests_per_hour": 1000,
+        "concurrent_requests": 10
+    },
+    "endpoints": {
+        "assist": "/assist - Main query processing endpoint",
+        "health": "/health - Health check endpoint",
+        "info": "/info - Agent information endpoint",
+        "docs": "/docs - API documentation"
+    }
+}
+_AGENT_INFO_JSON = orjson.dumps(_AGENT_INFO)
+
+# Seconds a rendered /metrics or /security body is served before rebuilding
+_SNAPSHOT_TTL = 1.0
+
+# Reset response handlers kept for reuse across /assist requests
+_HANDLER_POOL: "deque[StreamingResponseHandler]" = deque(maxlen=256)
+
 
 class RateLimiter:
-    """Advanced in-memory rate limiter with multiple tiers."""
+    """
+    Advanced in-memory rate limiter with multiple tiers.
+    
+    Uses a sliding window counter: each key keeps only the request counts of
+    the current and previous fixed windows, and the number of requests in the
+    trailing window is estimated by weighting the previous count by how much
+    of it still overlaps.
+    """
 
-    def __init__(self, max_requests: int = 60, window_seconds: int = 60):
+    def __init__(self, max_requests: int = 60, window_seconds: int = 60, max_keys: int = 100_000):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.requests = defaultdict(deque)
+        self.max_keys = max_keys
+        # LRU of key -> (current window index, current window count, previous window count)
+        self.counters: "OrderedDict[str, Tuple[int, int, int]]" = OrderedDict()
 
         # Different limits for different endpoints
         self.endpoint_limits = {
@@ -56,44 +136,66 @@ class RateLimiter:
             "/info": {"max_requests": 60, "window": 60},     # 60 per minute for info
             "/metrics": {"max_requests": 10, "window": 60}   # 10 per minute for metrics
         }
+        self._endpoint_windows = {
+            endpoint: (limits["max_requests"], limits["window"])
+            for endpoint, limits in self.endpoint_limits.items()
+        }
+    
+    def _limits(self, endpoint: Optional[str]) -> Tuple[int, int]:
+        """Return (max_requests, window_seconds) for an endpoint."""
+        return self._endpoint_windows.get(endpoint, (self.max_requests, self.window_seconds))
     
-    def is_allowed(self, client_id: str, endpoint: str = None) -> bool:
-        """Check if request is allowed for client and endpoint."""
+    def is_allowed(self, client_id: str, endpoint: str = None,
+                   limits: Optional[Tuple[int, int]] = None) -> bool:
+        """
+        Check if request is allowed for client and endpoint.
+        
+        Args:
+            client_id: Client identifier
+            endpoint: Endpoint path, used for per-endpoint limits and tracking
+            limits: Pre-resolved (max_requests, window_seconds) for the endpoint
+            
+        Returns:
+            True if the request is within the limit
+        """
         now = time.time()
-
-        # Get endpoint-specific limits
-        if endpoint and endpoint in self.endpoint_limits:
-            limits = self.endpoint_limits[endpoint]
-            max_requests = limits["max_requests"]
-            window_seconds = limits["window"]
-        else:
-            max_requests = self.max_requests
-            window_seconds = self.window_seconds
+        max_requests, window_seconds = limits or self._limits(endpoint)
 
         # Use endpoint-specific key for tracking
         key = f"{client_id}:{endpoint}" if endpoint else client_id
-        client_requests = self.requests[key]
+        window = int(now // window_seconds)
+        current = previous = 0
 
-        # Remove old requests outside the window
-        while client_requests and client_requests[0] < now - window_seconds:
-            client_requests.popleft()
+        stored = self.counters.get(key)
+        if stored is not None:
+            stored_window, stored_current, stored_previous = stored
+            if stored_window == window:
+                current, previous = stored_current, stored_previous
+            elif stored_window == window - 1:
+                previous = stored_current
 
-        # Check if under limit
-        if len(client_requests) < max_requests:
-            client_requests.append(now)
-            return True
+        # Estimate requests in the trailing window from the two fixed windows
+        elapsed_fraction = (now % window_seconds) / window_seconds
+        allowed = previous * (1 - elapsed_fraction) + current < max_requests
+        if allowed:
+            current += 1
 
-        return False
+        # Keep the most recently seen clients, dropping the least recent beyond max_keys
+        self.counters[key] = (window, current, previous)
+        self.counters.move_to_end(key)
+        if len(self.counters) > self.max_keys:
+            self.counters.popitem(last=False)
+
+        return allowed
     
-    def get_reset_time(self, client_id: str) -> int:
+    def get_reset_time(self, client_id: str, endpoint: str = None) -> int:
         """Get time until rate limit resets."""
-        client_requests = self.requests[client_id]
-        if not client_requests:
+        key = f"{client_id}:{endpoint}" if endpoint else client_id
+        if key not in self.counters:
             return 0
         
-        oldest_request = client_requests[0]
-        reset_time = oldest_request + self.window_seconds
-        return max(0, int(reset_time - time.time()))
+        _, window_seconds = self._limits(endpoint)
+        return max(0, int(window_seconds - time.time() % window_seconds))
 
 
 class EnhancedSentientServer:
@@ -114,6 +216,9 @@ class EnhancedSentientServer:
             failure_threshold=5,
             recovery_timeout=60
         )
+
+        # Rendered monitoring snapshots: name -> (built at, body, etag)
+        self._snapshots: Dict[str, Tuple[float, bytes, str]] = {}
         
         # Create FastAPI app
         self.app = FastAPI(
@@ -121,7 +226,9 @@ class EnhancedSentientServer:
             description="Reddit/Twitter query agent for SentientChat",
             version="1.0.0",
             docs_url="/docs",
-            redoc_url="/redoc"
+            redoc_url="/redoc",
+            default_response_class=ORJSONResponse,
+            lifespan=_lifespan
         )
         
         # Add CORS middleware
@@ -138,6 +245,12 @@ class EnhancedSentientServer:
             allow_headers=["*"],
         )
         
+        # Resolve the client identifier once per request
+        @self.app.middleware("http")
+        async def bind_client_id(request: Request, call_next):
+            _client_id_var.set(self._resolve_client_id(request))
+            return await call_next(request)
+        
         # Initialize Sentient framework server
         self.sentient_server = DefaultServer(agent)
         
@@ -149,19 +262,55 @@ class EnhancedSentientServer:
         
         logger.info("Enhanced SentientEcho server initialized")
     
-    def _get_client_id(self, request: Request) -> str:
-        """Get client identifier for rate limiting."""
+    @staticmethod
+    def _resolve_client_id(request: Request) -> str:
+        """Extract the client identifier from request headers."""
         # Use IP address as client identifier
         forwarded_for = request.headers.get("X-Forwarded-For")
         if forwarded_for:
             return forwarded_for.split(",")[0].strip()
         return request.client.host if request.client else "unknown"
     
-    def _create_rate_limit_check(self, endpoint: str):
-        """Create endpoint-specific rate limit check."""
-        async def check_rate_limit(request: Request):
-            """Rate limiting dependency with security monitoring."""
-            client_id = self._get_client_id(request)
+    def _get_client_id(self) -> str:
+        """Get client identifier for rate limiting."""
+        return _client_id_var.get("unknown")
+    
+    async def _snapshot_response(self, name: str, request: Request, build) -> Response:
+        """
+        Serve a briefly cached JSON snapshot with ETag revalidation.
+        
+        Args:
+            name: Snapshot cache key
+            request: Incoming request, checked for If-None-Match
+            build: Coroutine function returning the payload to render
+            
+        Returns:
+            The cached or freshly rendered response, or 304 if unchanged
+        """
+        now = time.monotonic()
+        snapshot = self._snapshots.get(name)
+        if snapshot is None or now - snapshot[0] >= _SNAPSHOT_TTL:
+            body = orjson.dumps(await build(), option=orjson.OPT_NON_STR_KEYS)
+            etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+            snapshot = (now, body, etag)
+            self._snapshots[name] = snapshot
+
+        _, body, etag = snapshot
+        if request.headers.get("If-None-Match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(content=body, media_type="application/json", headers={"ETag": etag})
+    
+    def _create_request_gate(self, endpoint: str):
+        """Create an endpoint-specific dependency that admits and decodes requests."""
+        limits = self.rate_limiter._limits(endpoint)
+
+        async def request_gate(req: Request) -> Dict[str, Any]:
+            """Check the client, rate limit and body in one pass.
+            
+            Returns:
+                Sanitized request data
+            """
+            client_id = self._get_client_id()
 
             # Check if IP is suspicious
             if security_monitor.is_suspicious_ip(client_id):
@@ -174,9 +323,9 @@ class EnhancedSentientServer:
                     }
                 )
 
-            if not self.rate_limiter.is_allowed(client_id, endpoint):
+            if not self.rate_limiter.is_allowed(client_id, endpoint, limits):
                 security_monitor.log_rate_limit_violation(client_id)
-                reset_time = self.rate_limiter.get_reset_time(client_id)
+                reset_time = self.rate_limiter.get_reset_time(client_id, endpoint)
                 raise HTTPException(
                     status_code=429,
                     detail={
@@ -188,7 +337,26 @@ class EnhancedSentientServer:
                     headers={"Retry-After": str(reset_time)}
                 )
 
-        return check_rate_limit
+            # Decode the raw body directly; malformed JSON fails validation below
+            try:
+                request = orjson.loads(await req.body())
+            except orjson.JSONDecodeError:
+                request = None
+
+            # Validate request data
+            is_valid, error_msg = validate_request_data(request)
+            if not is_valid:
+                security_monitor.log_blocked_query(
+                    str(request), error_msg, client_id
+                )
+                raise HTTPException(
+                    status_code=400,
+                    detail={"error": "Invalid request", "message": error_msg}
+                )
+
+            return sanitize_request_data(request)
+
+        return request_gate
     
     def _setup_sentient_routes(self):
         """Setup routes from Sentient Agent Framework."""
@@ -211,28 +379,10 @@ class EnhancedSentientServer:
         """Setup assist endpoint manually if framework mounting fails."""
         @self.app.post("/assist")
         async def assist_endpoint(
-            request: Dict[str, Any],
-            req: Request = None,
-            _: None = Depends(self._create_rate_limit_check("/assist"))
+            sanitized_request: Dict[str, Any] = Depends(self._create_request_gate("/assist"))
         ):
             """Main assist endpoint for SentientChat integration."""
             try:
-                client_ip = self._get_client_id(req) if req else "unknown"
-
-                # Validate request data
-                is_valid, error_msg = validate_request_data(request)
-                if not is_valid:
-                    security_monitor.log_blocked_query(
-                        str(request), error_msg, client_ip
-                    )
-                    raise HTTPException(
-                        status_code=400,
-                        detail={"error": "Invalid request", "message": error_msg}
-                    )
-
-                # Sanitize request data
-                sanitized_request = sanitize_request_data(request)
-
                 # Extract session and query from sanitized request
                 session_id = sanitized_request.get("session_id", "default")
                 query_data = sanitized_request.get("query", {})
@@ -242,19 +392,23 @@ class EnhancedSentientServer:
                 session = Session(session_id=session_id)
                 query = Query(prompt=prompt, context=query_data.get("context", {}))
                 
-                # Create response handler for streaming
-                response_handler = StreamingResponseHandler()
-                
-                # Process the query
-                await self.agent.assist(session, query, response_handler)
-                
-                # Return the collected response
-                return {
-                    "session_id": session_id,
-                    "events": response_handler.events,
-                    "final_response": response_handler.final_response,
-                    "completed": response_handler.completed
-                }
+                # Reuse a pooled response handler for streaming
+                response_handler = _HANDLER_POOL.pop() if _HANDLER_POOL else StreamingResponseHandler()
+                try:
+                    # Process the query
+                    await self.agent.assist(session, query, response_handler)
+                    
+                    # Return the collected response
+                    return {
+                        "session_id": session_id,
+                        "events": response_handler.events,
+                        "final_response": response_handler.final_response,
+                        "completed": response_handler.completed,
+                        "truncated": response_handler.truncated
+                    }
+                finally:
+                    response_handler.reset()
+                    _HANDLER_POOL.append(response_handler)
                 
             except Exception as e:
                 logger.error(f"Error in assist endpoint: {e}")
@@ -284,7 +438,7 @@ class EnhancedSentientServer:
                 except Exception:
                     ai_status = "unhealthy"
                 
-                return {
+                health = {
                     "status": "healthy" if agent_status == "healthy" and ai_status == "healthy" else "degraded",
                     "agent": self.settings.agent_name,
                     "version": "1.0.0",
@@ -297,9 +451,10 @@ class EnhancedSentientServer:
                     },
                     "uptime": "unknown"  # Could be enhanced with actual uptime tracking
                 }
+                return Response(content=orjson.dumps(health), media_type="application/json")
             except Exception as e:
                 logger.error(f"Health check failed: {e}")
-                return JSONResponse(
+                return ORJSONResponse(
                     status_code=503,
                     content={
                         "status": "unhealthy",
@@ -311,49 +466,11 @@ class EnhancedSentientServer:
         @self.app.get("/info")
         async def agent_info():
             """Agent information endpoint."""
-            return {
-                "name": "SentientEcho",
-                "description": "Answers any query using real Reddit and Twitter posts. Cuts through noise with actual public sentiment and AI summaries.",
-                "version": "1.0.0",
-                "capabilities": [
-                    "Reddit Fetch",
-                    "Twitter Fetch",
-                    "Real Post Context",
-                    "AI Summary",
-                    "Query Filters",
-                    "Sentiment Analysis",
-                    "Relevance Ranking"
-                ],
-                "example_queries": [
-                    "What do Redditors say about Coinbase's recent outage?",
-                    "Latest Twitter sentiment on ETH ETFs?",
-                    "Best subreddit discussions on productivity tools in 2025?",
-                    "How is the gaming community reacting to GTA 6 leaks?",
-                    "Python programming opinions on r/learnpython this week"
-                ],
-                "supported_filters": {
-                    "subreddit": "Specific subreddit to search (e.g., 'MachineLearning')",
-                    "time_range": "day, week, month, year",
-                    "sentiment": "positive, negative, neutral, any"
-                },
-                "rate_limits": {
-                    "requests_per_minute": 60,
-                    "requests_per_hour": 1000,
-                    "concurrent_requests": 10
-                },
-                "endpoints": {
-                    "assist": "/assist - Main query processing endpoint",
-                    "health": "/health - Health check endpoint",
-                    "info": "/info - Agent information endpoint",
-                    "docs": "/docs - API documentation"
-                }
-            }
+            return Response(content=_AGENT_INFO_JSON, media_type="application/json")
         
-        @self.app.get("/metrics")
-        async def metrics():
-            """Basic metrics endpoint with security and cache stats."""
+        async def build_metrics():
             security_stats = security_monitor.get_security_stats()
-            cache_stats = await get_cache_stats()
+            cache_stats = get_cache_stats()
 
             return {
                 "requests_total": "unknown",
@@ -366,10 +483,7 @@ class EnhancedSentientServer:
                 "circuit_breaker_state": self.circuit_breaker.state
             }
 
-        @self.app.get("/security")
-        async def security_status():
-            """Security monitoring endpoint (admin only)."""
-            # In production, this should require authentication
+        async def build_security_status():
             return {
                 "status": "monitoring",
                 "stats": security_monitor.get_security_stats(),
@@ -379,6 +493,17 @@ class EnhancedSentientServer:
                     "last_failure": self.circuit_breaker.last_failure_time
                 }
             }
+
+        @self.app.get("/metrics")
+        async def metrics(request: Request):
+            """Basic metrics endpoint with security and cache stats."""
+            return await self._snapshot_response("metrics", request, build_metrics)
+
+        @self.app.get("/security")
+        async def security_status(request: Request):
+            """Security monitoring endpoint (admin only)."""
+            # In production, this should require authentication
+            return await self._snapshot_response("security", request, build_security_status)
     
     def run(self, host: str = "0.0.0.0", port: int = 8000, debug: bool = False):
         """Run the enhanced server."""
@@ -387,46 +512,83 @@ class EnhancedSentientServer:
             self.app,
             host=host,
             port=port,
-            debug=debug,
+            loop="auto",  # uvloop when installed
+            http="httptools",
+            log_level="debug" if debug else "info",
             access_log=True
         )
 
 
 class StreamingResponseHandler:
-    """Response handler for collecting streaming responses."""
+    """Response handler for collecting streaming responses.
+    
+    Events are recorded as parallel columns and only turned into dicts
+    when ``events`` is read. Only the most recent ``max_events`` events are
+    kept; ``truncated`` records whether older ones were dropped.
+    """
     
-    def __init__(self):
-        self.events = []
+    def __init__(self, max_events: int = 1024):
+        self.max_events = max_events
+        self._types = deque(maxlen=max_events)
+        self._event_types = deque(maxlen=max_events)
+        self._payloads = deque(maxlen=max_events)
+        self._error_codes = deque(maxlen=max_events)
+        self._timestamps = deque(maxlen=max_events)
         self.final_response = ""
         self.completed = False
+        self.truncated = False
+    
+    def reset(self):
+        """Clear recorded state so the handler can serve another request."""
+        self._types.clear()
+        self._event_types.clear()
+        self._payloads.clear()
+        self._error_codes.clear()
+        self._timestamps.clear()
+        self.final_response = ""
+        self.completed = False
+        self.truncated = False
+    
+    def _record(self, kind: str, event_type: str, payload: Any, error_code: Optional[str] = None):
+        """Append one event to the column buffers, evicting the oldest when full."""
+        if len(self._types) == self.max_events:
+            self.truncated = True
+        self._types.append(kind)
+        self._event_types.append(event_type)
+        self._payloads.append(payload)
+        self._error_codes.append(error_code)
+        self._timestamps.append(time.time())
+    
+    @property
+    def events(self) -> List[Dict[str, Any]]:
+        """Materialize the recorded events as dicts."""
+        events = []
+        for kind, event_type, payload, error_code, timestamp in zip(
+            self._types, self._event_types, self._payloads, self._error_codes, self._timestamps
+        ):
+            event = {"type": kind, "event_type": event_type}
+            if kind == "error":
+                event["error_code"] = error_code
+                event["details"] = payload
+            elif kind == "json":
+                event["data"] = payload
+            else:
+                event["content"] = payload
+            event["timestamp"] = timestamp
+            events.append(event)
+        return events
     
     async def emit_text_block(self, event_type: str, content: str):
         """Capture text block events."""
-        self.events.append({
-            "type": "text_block",
-            "event_type": event_type,
-            "content": content,
-            "timestamp": datetime.utcnow().isoformat()
-        })
+        self._record("text_block", event_type, content)
     
     async def emit_json(self, event_type: str, data: dict):
         """Capture JSON events."""
-        self.events.append({
-            "type": "json",
-            "event_type": event_type,
-            "data": data,
-            "timestamp": datetime.utcnow().isoformat()
-        })
+        self._record("json", event_type, data)
     
     async def emit_error(self, event_type: str, error_code: str, details: dict):
         """Capture error events."""
-        self.events.append({
-            "type": "error",
-            "event_type": event_type,
-            "error_code": error_code,
-            "details": details,
-            "timestamp": datetime.utcnow().isoformat()
-        })
+        self._record("error", event_type, details, error_code)
     
     async def complete(self):
         """Mark response as complete."""
@@ -444,17 +606,14 @@ class TextStreamCollector:
         self.event_type = event_type
         self.handler = handler
         self.content = ""
+        self._chunks = []
     
     async def emit_chunk(self, chunk: str):
         """Collect text chunks."""
-        self.content += chunk
+        self._chunks.append(chunk)
     
     async def complete(self):
         """Complete the stream."""
+        self.content = "".join(self._chunks)
         self.handler.final_response = self.content
-        self.handler.events.append({
-            "type": "text_stream",
-            "event_type": self.event_type,
-            "content": self.content,
-            "timestamp": datetime.utcnow().isoformat()
-        })
+        self.handler._record("text_stream", self.event_type, self.content)
@@ -3,13 +3,17 @@ Caching utilities for improved performance.
 """
 
 import asyncio
+import copy
 import time
 import hashlib
-import json
-from typing import Any, Optional, Dict, Callable
+import heapq
+from typing import Any, Awaitable, Optional, Dict, Callable, List, Sequence, Tuple
 from datetime import datetime, timedelta
 from collections import OrderedDict
 
+import numpy as np
+import orjson
+
 try:
     from .logger import get_logger
 except ImportError:
@@ -21,9 +25,17 @@ except ImportError:
 
 logger = get_logger(__name__)
 
+# Punctuation stripped from queries before they are used as cache keys
+_QUERY_PUNCTUATION = str.maketrans('', '', '?!.')
+
 
 class LRUCache:
-    """Thread-safe LRU cache implementation."""
+    """
+    LRU cache implementation with per-entry expiry.
+    
+    Operations never await, so they are atomic on the event loop and need no
+    lock; use an instance from a single event loop thread only.
+    """
     
     def __init__(self, max_size: int = 1000, ttl_seconds: int = 300):
         """
@@ -35,89 +47,77 @@ class LRUCache:
         """
         self.max_size = max_size
         self.ttl_seconds = ttl_seconds
-        self.cache = OrderedDict()
-        self.timestamps = {}
-        self._lock = asyncio.Lock()
+        # key -> (expiry time, value), least recently used first
+        self.cache: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        # Min-heap of (expiry time, key); entries for replaced or removed keys are skipped lazily
+        self._expiry_heap: List[Tuple[float, str]] = []
     
     def _generate_key(self, *args, **kwargs) -> str:
         """Generate cache key from arguments."""
         key_data = {
             'args': args,
-            'kwargs': sorted(kwargs.items())
+            'kwargs': kwargs
         }
-        key_str = json.dumps(key_data, sort_keys=True, default=str)
-        return hashlib.md5(key_str.encode()).hexdigest()
+        key_bytes = orjson.dumps(
+            key_data, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+        )
+        return hashlib.blake2b(key_bytes, digest_size=16).hexdigest()
     
-    async def get(self, key: str) -> Optional[Any]:
+    def get(self, key: str) -> Optional[Any]:
         """Get item from cache."""
-        async with self._lock:
-            if key not in self.cache:
-                return None
-            
-            # Check if expired
-            if self._is_expired(key):
-                del self.cache[key]
-                del self.timestamps[key]
-                return None
-            
-            # Move to end (most recently used)
-            value = self.cache.pop(key)
-            self.cache[key] = value
-            
-            return value
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        
+        # Check if expired
+        expiry, value = entry
+        if expiry < time.time():
+            del self.cache[key]
+            return None
+        
+        # Move to end (most recently used)
+        self.cache.move_to_end(key)
+        
+        return value
     
-    async def set(self, key: str, value: Any) -> None:
+    def set(self, key: str, value: Any) -> None:
         """Set item in cache."""
-        async with self._lock:
-            # Remove if already exists
-            if key in self.cache:
-                del self.cache[key]
-            
-            # Add new item
-            self.cache[key] = value
-            self.timestamps[key] = time.time()
-            
-            # Remove oldest items if over capacity
-            while len(self.cache) > self.max_size:
-                oldest_key = next(iter(self.cache))
-                del self.cache[oldest_key]
-                del self.timestamps[oldest_key]
+        # Add or refresh the item as most recently used
+        expiry = time.time() + self.ttl_seconds
+        self.cache[key] = (expiry, value)
+        self.cache.move_to_end(key)
+        heapq.heappush(self._expiry_heap, (expiry, key))
+        
+        # Rebuild the heap once stale entries dominate, for caches that are never cleaned up
+        if len(self._expiry_heap) > 2 * self.max_size:
+            self._expiry_heap = [(entry[0], cached_key) for cached_key, entry in self.cache.items()]
+            heapq.heapify(self._expiry_heap)
+        
+        # Remove oldest items if over capacity
+        while len(self.cache) > self.max_size:
+            self.cache.popitem(last=False)
     
-    async def delete(self, key: str) -> bool:
+    def delete(self, key: str) -> bool:
         """Delete item from cache."""
-        async with self._lock:
-            if key in self.cache:
-                del self.cache[key]
-                del self.timestamps[key]
-                return True
-            return False
+        return self.cache.pop(key, None) is not None
     
-    async def clear(self) -> None:
+    def clear(self) -> None:
         """Clear all cache entries."""
-        async with self._lock:
-            self.cache.clear()
-            self.timestamps.clear()
+        self.cache.clear()
+        self._expiry_heap.clear()
     
-    def _is_expired(self, key: str) -> bool:
-        """Check if cache entry is expired."""
-        if key not in self.timestamps:
-            return True
-        
-        age = time.time() - self.timestamps[key]
-        return age > self.ttl_seconds
-    
-    async def cleanup_expired(self) -> int:
+    def cleanup_expired(self) -> int:
         """Remove expired entries and return count removed."""
+        now = time.time()
         removed_count = 0
-        async with self._lock:
-            expired_keys = [
-                key for key in self.cache.keys()
-                if self._is_expired(key)
-            ]
-            
-            for key in expired_keys:
+        
+        # Pop only the expired part of the heap instead of scanning every entry
+        heap = self._expiry_heap
+        while heap and heap[0][0] < now:
+            expiry, key = heapq.heappop(heap)
+            entry = self.cache.get(key)
+            if entry is not None and entry[0] == expiry:
                 del self.cache[key]
-                del self.timestamps[key]
                 removed_count += 1
         
         if removed_count > 0:
@@ -125,16 +125,16 @@ class LRUCache:
         
         return removed_count
     
-    async def get_stats(self) -> Dict[str, Any]:
+    def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
-        async with self._lock:
-            return {
-                "size": len(self.cache),
-                "max_size": self.max_size,
-                "ttl_seconds": self.ttl_seconds,
-                "oldest_entry": min(self.timestamps.values()) if self.timestamps else None,
-                "newest_entry": max(self.timestamps.values()) if self.timestamps else None
-            }
+        expiries = [expiry for expiry, _ in self.cache.values()]
+        return {
+            "size": len(self.cache),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "oldest_entry": min(expiries) - self.ttl_seconds if expiries else None,
+            "newest_entry": max(expiries) - self.ttl_seconds if expiries else None
+        }
 
 
 class QueryCache:
@@ -148,23 +148,15 @@ class QueryCache:
     
     def _normalize_query(self, query: str) -> str:
         """Normalize query for consistent caching."""
-        # Convert to lowercase and strip whitespace
-        normalized = query.lower().strip()
-        
-        # Remove extra whitespace
-        normalized = ' '.join(normalized.split())
-        
-        # Remove common punctuation that doesn't affect meaning
-        normalized = normalized.replace('?', '').replace('!', '').replace('.', '')
-        
-        return normalized
+        # Lowercase, drop punctuation that doesn't affect meaning, and collapse whitespace
+        return ' '.join(query.lower().translate(_QUERY_PUNCTUATION).split())
     
-    async def get_cached_result(self, query: str) -> Optional[Any]:
+    def get_cached_result(self, query: str) -> Optional[Any]:
         """Get cached result for query."""
         normalized_query = self._normalize_query(query)
         key = f"query:{normalized_query}"
         
-        result = await self.cache.get(key)
+        result = self.cache.get(key)
         
         if result is not None:
             self.hit_count += 1
@@ -175,17 +167,17 @@ class QueryCache:
         
         return result
     
-    async def cache_result(self, query: str, result: Any) -> None:
+    def cache_result(self, query: str, result: Any) -> None:
         """Cache result for query."""
         normalized_query = self._normalize_query(query)
         key = f"query:{normalized_query}"
         
-        await self.cache.set(key, result)
+        self.cache.set(key, result)
         logger.debug(f"Cached result for query: {query[:50]}...")
     
-    async def get_cache_stats(self) -> Dict[str, Any]:
+    def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
-        cache_stats = await self.cache.get_stats()
+        cache_stats = self.cache.get_stats()
         
         total_requests = self.hit_count + self.miss_count
         hit_rate = (self.hit_count / total_requests * 100) if total_requests > 0 else 0
@@ -199,6 +191,140 @@ class QueryCache:
         }
 
 
+class SearchCache:
+    """
+    Short-lived cache of search results that also shares in-flight searches.
+    
+    Concurrent lookups of the same key await a single fetch, and callers
+    always receive their own copy of the result.
+    """
+    
+    def __init__(self, max_size: int = 256, ttl_seconds: int = 120):
+        """
+        Initialize search cache.
+        
+        Args:
+            max_size: Maximum number of searches to cache
+            ttl_seconds: Time to live for cached results in seconds
+        """
+        self.cache = LRUCache(max_size, ttl_seconds)
+        self._inflight: Dict[str, asyncio.Task] = {}
+    
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached result for key, running fetch on a miss.
+        
+        Args:
+            key: Cache key identifying the search
+            fetch: Coroutine function performing the search
+            
+        Returns:
+            Copy of the search result
+        """
+        result = self.cache.get(key)
+        if result is not None:
+            logger.debug(f"Search cache hit: {key}")
+            return copy.deepcopy(result)
+        
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_and_store(key, fetch))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        
+        # Shield so a cancelled caller does not cancel the search for the others
+        return copy.deepcopy(await asyncio.shield(task))
+    
+    async def _fetch_and_store(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Run a search and cache it unless it came back empty."""
+        result = await fetch()
+        if result:
+            self.cache.set(key, result)
+        return result
+
+
+class SemanticQueryCache:
+    """
+    Cache of query analyses looked up by embedding similarity.
+    
+    Stored embeddings are kept L2-normalized in one float32 matrix, so a
+    lookup is a single matrix-vector product against every entry.
+    """
+    
+    def __init__(self, max_size: int = 2048, threshold: float = 0.92):
+        """
+        Initialize semantic query cache.
+        
+        Args:
+            max_size: Maximum number of queries to cache
+            threshold: Minimum cosine similarity for a cache hit
+        """
+        self.max_size = max_size
+        self.threshold = threshold
+        self.embeddings: Optional[np.ndarray] = None  # (N, D) float32
+        self.entries: List[tuple] = []                # (query, analysis) per row
+        self.last_used: List[int] = []                # access counter per row
+        self._clock = 0
+    
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> Optional[np.ndarray]:
+        """Return the embedding as a unit float32 vector, or None if degenerate."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if vector.ndim != 1 or norm == 0:
+            return None
+        return vector / norm
+    
+    def get(self, embedding: Sequence[float]) -> Optional[Dict[str, Any]]:
+        """Return the analysis of the most similar cached query, if close enough."""
+        if self.embeddings is None:
+            return None
+        
+        vector = self._normalize(embedding)
+        if vector is None or vector.shape[0] != self.embeddings.shape[1]:
+            return None
+        
+        similarities = self.embeddings @ vector
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            return None
+        
+        self._clock += 1
+        self.last_used[best] = self._clock
+        query, analysis = self.entries[best]
+        logger.debug(f"Semantic cache hit: {query[:50]} ({similarities[best]:.3f})")
+        return copy.deepcopy(analysis)
+    
+    def set(self, query: str, embedding: Sequence[float], analysis: Dict[str, Any]) -> None:
+        """Store an analysis, replacing the least recently used entry when full."""
+        vector = self._normalize(embedding)
+        if vector is None:
+            return
+        
+        if self.embeddings is not None and vector.shape[0] != self.embeddings.shape[1]:
+            # Embedding model changed; start over with the new dimensionality
+            self.embeddings = None
+            self.entries.clear()
+            self.last_used.clear()
+        
+        self._clock += 1
+        entry = (query, copy.deepcopy(analysis))
+        
+        if self.embeddings is None:
+            self.embeddings = vector[np.newaxis, :]
+            self.entries.append(entry)
+            self.last_used.append(self._clock)
+        elif len(self.entries) < self.max_size:
+            self.embeddings = np.vstack((self.embeddings, vector))
+            self.entries.append(entry)
+            self.last_used.append(self._clock)
+        else:
+            oldest = int(np.argmin(self.last_used))
+            self.embeddings[oldest] = vector
+            self.entries[oldest] = entry
+            self.last_used[oldest] = self._clock
+
+
 def cache_async_function(cache: LRUCache, ttl_seconds: Optional[int] = None):
     """
     Decorator to cache async function results.
@@ -213,7 +339,7 @@ def cache_async_function(cache: LRUCache, ttl_seconds: Optional[int] = None):
             key = f"func:{func.__name__}:{cache._generate_key(*args, **kwargs)}"
             
             # Try to get from cache
-            result = await cache.get(key)
+            result = cache.get(key)
             if result is not None:
                 logger.debug(f"Cache hit for function {func.__name__}")
                 return result
@@ -223,7 +349,7 @@ def cache_async_function(cache: LRUCache, ttl_seconds: Optional[int] = None):
             result = await func(*args, **kwargs)
             
             # Cache result
-            await cache.set(key, result)
+            cache.set(key, result)
             
             return result
         
@@ -244,7 +370,7 @@ class CacheManager:
         self._cleanup_task = None
         self._initialized = False
     
-    async def _ensure_initialized(self):
+    def _ensure_initialized(self):
         """Ensure cache manager is initialized with cleanup task."""
         if not self._initialized:
             self._start_cleanup_task()
@@ -258,9 +384,9 @@ class CacheManager:
                     await asyncio.sleep(60)  # Run every minute
 
                     # Cleanup expired entries
-                    await self.query_cache.cache.cleanup_expired()
-                    await self.post_cache.cleanup_expired()
-                    await self.ai_cache.cleanup_expired()
+                    self.query_cache.cache.cleanup_expired()
+                    self.post_cache.cleanup_expired()
+                    self.ai_cache.cleanup_expired()
 
                 except Exception as e:
                     logger.error(f"Error in cache cleanup: {e}")
@@ -271,20 +397,20 @@ class CacheManager:
             # No event loop running, will start later
             pass
     
-    async def get_all_stats(self) -> Dict[str, Any]:
+    def get_all_stats(self) -> Dict[str, Any]:
         """Get statistics for all caches."""
-        await self._ensure_initialized()
+        self._ensure_initialized()
         return {
-            "query_cache": await self.query_cache.get_cache_stats(),
-            "post_cache": await self.post_cache.get_stats(),
-            "ai_cache": await self.ai_cache.get_stats()
+            "query_cache": self.query_cache.get_cache_stats(),
+            "post_cache": self.post_cache.get_stats(),
+            "ai_cache": self.ai_cache.get_stats()
         }
     
-    async def clear_all_caches(self) -> None:
+    def clear_all_caches(self) -> None:
         """Clear all caches."""
-        await self.query_cache.cache.clear()
-        await self.post_cache.clear()
-        await self.ai_cache.clear()
+        self.query_cache.cache.clear()
+        self.post_cache.clear()
+        self.ai_cache.clear()
         logger.info("Cleared all caches")
     
     async def shutdown(self):
@@ -302,18 +428,18 @@ cache_manager = CacheManager()
 
 
 # Convenience functions
-async def get_cached_query_result(query: str) -> Optional[Any]:
+def get_cached_query_result(query: str) -> Optional[Any]:
     """Get cached result for query."""
-    await cache_manager._ensure_initialized()
-    return await cache_manager.query_cache.get_cached_result(query)
+    cache_manager._ensure_initialized()
+    return cache_manager.query_cache.get_cached_result(query)
 
 
-async def cache_query_result(query: str, result: Any) -> None:
+def cache_query_result(query: str, result: Any) -> None:
     """Cache result for query."""
-    await cache_manager._ensure_initialized()
-    await cache_manager.query_cache.cache_result(query, result)
+    cache_manager._ensure_initialized()
+    cache_manager.query_cache.cache_result(query, result)
 
 
-async def get_cache_stats() -> Dict[str, Any]:
+def get_cache_stats() -> Dict[str, Any]:
     """Get all cache statistics."""
-    return await cache_manager.get_all_stats()
+    return cache_manager.get_all_stats()
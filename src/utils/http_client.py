@@ -0,0 +1,51 @@
+"""
+Shared HTTP client settings for the API providers.
+"""
+
+from typing import Optional
+
+import httpx
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Connection pool shared by each provider's concurrent API requests
+HTTP_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=30.0)
+
+# Client for unauthenticated and per-request-authenticated APIs, created on first use
+_shared_client: Optional[httpx.AsyncClient] = None
+
+
+def client_options() -> dict:
+    """Return the keyword arguments for a pooled, HTTP/2 capable httpx client."""
+    return {"http2": HTTP2_AVAILABLE, "limits": HTTP_LIMITS}
+
+
+def get_shared_client() -> httpx.AsyncClient:
+    """
+    Return the process-wide HTTP client, creating it if needed.
+    
+    Providers pass their own headers per request, so one connection pool
+    serves all of them and connections survive provider re-creation.
+    
+    Returns:
+        Shared httpx.AsyncClient
+    """
+    global _shared_client
+    if _shared_client is None or _shared_client.is_closed:
+        _shared_client = httpx.AsyncClient(
+            timeout=30.0,
+            transport=httpx.AsyncHTTPTransport(retries=2, **client_options())
+        )
+    return _shared_client
+
+
+async def close_shared_client() -> None:
+    """Close the shared HTTP client at application shutdown."""
+    global _shared_client
+    if _shared_client is not None:
+        await _shared_client.aclose()
+        _shared_client = None
@@ -0,0 +1,213 @@
+"""
+Tests for the SentientEcho agent pipeline.
+"""
+
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("sentient_agent_framework")
+
+from src.models.post import Post, ProcessedQuery
+from src.sentient_echo_agent import SentientEchoAgent
+from src.utils.cache import cache_manager
+
+
+def make_post(post_id: str) -> Post:
+    """Create a post with sensible defaults for testing."""
+    return Post(
+        id=post_id,
+        source="Reddit",
+        content=f"Post {post_id} about the new async runtime release",
+        author="u/tester",
+        created_at=datetime(2024, 1, 2),
+        url=f"https://reddit.com/{post_id}",
+        engagement_score=10.0
+    )
+
+
+class FakeQueryProcessor:
+    """Query processor stub that searches Reddit only for the prompt's words."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def process_query(self, query: str) -> ProcessedQuery:
+        self.calls += 1
+        return ProcessedQuery(
+            original_query=query,
+            keywords=query.split(),
+            search_reddit=True,
+            search_twitter=False,
+            filters={"time_range": "week"},
+            intent=query
+        )
+
+
+class FakeRedditProvider:
+    """Reddit provider stub returning queued results once released."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def search_posts(self, keywords, subreddit=None, time_range="week"):
+        self.calls += 1
+        await self.release.wait()
+        return self.results.pop(0)
+
+
+class FakePostProcessor:
+    """Post processor stub that keeps posts unchanged."""
+
+    async def prefetch_enhancements(self, posts, query):
+        pass
+
+    async def process_posts(self, posts, query, max_posts=10):
+        return posts[:max_posts]
+
+
+class FakeStream:
+    """Text stream stub that records its content on completion."""
+
+    def __init__(self, event_type: str, handler: "FakeResponseHandler"):
+        self.event_type = event_type
+        self.handler = handler
+        self.chunks = []
+
+    async def emit_chunk(self, chunk: str):
+        self.chunks.append(chunk)
+
+    async def complete(self):
+        self.handler.events.append((self.event_type, "".join(self.chunks)))
+
+
+class FakeResponseHandler:
+    """Response handler stub recording (event type, payload) pairs."""
+
+    def __init__(self):
+        self.events = []
+        self.completed = False
+
+    async def emit_text_block(self, event_type: str, content: str):
+        self.events.append((event_type, content))
+
+    async def emit_json(self, event_type: str, data: dict):
+        self.events.append((event_type, data))
+
+    async def emit_error(self, event_type: str, error_code: str, details: dict):
+        self.events.append((event_type, error_code))
+
+    def create_text_stream(self, event_type: str):
+        return FakeStream(event_type, self)
+
+    async def complete(self):
+        self.completed = True
+
+    def event_types(self):
+        return [event_type for event_type, _ in self.events]
+
+
+@pytest.fixture
+def make_agent(monkeypatch):
+    """Build agents whose providers and processors are stubs."""
+    for name in ("FIREWORKS_API_KEY", "FIREWORKS_MODEL_ID", "SERPER_API_KEY", "JINA_AI_API_KEY"):
+        monkeypatch.setenv(name, "test")
+    monkeypatch.setattr(cache_manager, "_initialized", True)
+    cache_manager.clear_all_caches()
+
+    def factory(*results):
+        agent = SentientEchoAgent()
+        agent.query_processor = FakeQueryProcessor()
+        agent.reddit_provider = FakeRedditProvider(*results)
+        agent.post_processor = FakePostProcessor()
+        return agent
+
+    yield factory
+    cache_manager.clear_all_caches()
+
+
+async def test_concurrent_identical_prompts_share_one_pipeline(make_agent):
+    """Test that a prompt arriving while the same one runs waits for its result."""
+    agent = make_agent([make_post("a")])
+    agent.reddit_provider.release.clear()
+    first, second = FakeResponseHandler(), FakeResponseHandler()
+
+    leader = asyncio.ensure_future(agent.assist(None, SimpleNamespace(prompt="async runtime"), first))
+    await asyncio.sleep(0)
+    assert list(agent._inflight) == ["async runtime"]
+    waiter = asyncio.ensure_future(agent.assist(None, SimpleNamespace(prompt="Async  Runtime"), second))
+    await asyncio.sleep(0)
+    agent.reddit_provider.release.set()
+    await asyncio.gather(leader, waiter)
+
+    assert agent.query_processor.calls == agent.reddit_provider.calls == 1
+    assert "REDDIT_POSTS" in first.event_types()
+    assert second.event_types()[0] == "CACHE_HIT"
+    assert "REDDIT_POSTS" in second.event_types()
+    assert first.completed and second.completed
+    assert agent._inflight == {}
+
+
+async def test_waiter_reruns_pipeline_when_leader_finds_nothing(make_agent):
+    """Test that an empty in-flight result is not replayed to waiting callers."""
+    agent = make_agent([], [make_post("a")])
+    agent.reddit_provider.release.clear()
+    first, second = FakeResponseHandler(), FakeResponseHandler()
+
+    leader = asyncio.ensure_future(agent.assist(None, SimpleNamespace(prompt="async runtime"), first))
+    await asyncio.sleep(0)
+    assert "async runtime" in agent._inflight
+    waiter = asyncio.ensure_future(agent.assist(None, SimpleNamespace(prompt="async runtime"), second))
+    await asyncio.sleep(0)
+    agent.reddit_provider.release.set()
+    await asyncio.gather(leader, waiter)
+
+    assert agent.reddit_provider.calls == 2
+    assert "NO_RESULTS" in first.event_types()
+    assert "CACHE_HIT" not in second.event_types()
+    assert "REDDIT_POSTS" in second.event_types()
+
+
+async def test_waiters_share_one_rerun_when_leader_finds_nothing(make_agent):
+    """Test that several waiters on an empty leader join a single rerun."""
+    agent = make_agent([], [make_post("a")], [make_post("b")], [make_post("c")])
+    agent.reddit_provider.release.clear()
+    handlers = [FakeResponseHandler() for _ in range(4)]
+
+    tasks = []
+    for handler in handlers:
+        tasks.append(asyncio.ensure_future(
+            agent.assist(None, SimpleNamespace(prompt="async runtime"), handler)
+        ))
+        await asyncio.sleep(0)
+    agent.reddit_provider.release.set()
+    await asyncio.gather(*tasks)
+
+    assert agent.reddit_provider.calls <= 2
+    assert all("PROCESSING_ERROR" not in handler.event_types() for handler in handlers)
+    assert all("REDDIT_POSTS" in handler.event_types() for handler in handlers[1:])
+    assert all(handler.completed for handler in handlers)
+    assert agent._inflight == {}
+
+
+async def test_cache_hit_replays_recorded_events(make_agent):
+    """Test that a repeated prompt replays the intent and posts events from the cache."""
+    agent = make_agent([make_post("a")])
+    first, second = FakeResponseHandler(), FakeResponseHandler()
+
+    await agent.assist(None, SimpleNamespace(prompt="async runtime"), first)
+    await agent.assist(None, SimpleNamespace(prompt="Async runtime?"), second)
+
+    assert agent.reddit_provider.calls == 1
+    replayed = dict(second.events)
+    original = dict(first.events)
+    assert second.event_types()[0] == "CACHE_HIT"
+    assert replayed["QUERY_INTENT"] == original["QUERY_INTENT"]
+    assert replayed["REDDIT_POSTS"] == original["REDDIT_POSTS"]
+    assert replayed["FINAL_RESPONSE"] == original["FINAL_RESPONSE"]
+    assert second.completed
@@ -0,0 +1,134 @@
+"""
+Tests for the AI provider.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.providers.ai_provider import AIProvider, _parse_json_response
+
+
+class FakeCompletions:
+    """Chat completions stub returning canned responses in order."""
+
+    def __init__(self, *responses: str):
+        self.responses = list(responses)
+        self.calls = []
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        content = self.responses.pop(0)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))]
+        )
+
+
+def make_provider(*responses: str):
+    """Create an AI provider whose client returns the given responses."""
+    provider = AIProvider(api_key="test_key", model_id="test_model")
+    completions = FakeCompletions(*responses)
+    provider.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return provider, completions
+
+
+async def test_process_query_caches_identical_queries():
+    """Test that repeating a query does not call the model again."""
+    provider, completions = make_provider('```json\n{"keywords": ["python"], "intent": "x"}\n```')
+
+    first = await provider.process_query("python news")
+    first["keywords"].append("mutated")
+    second = await provider.process_query("python news")
+
+    assert len(completions.calls) == 1
+    assert second["keywords"] == ["python"]
+
+
+async def test_process_query_does_not_cache_fallback():
+    """Test that a failed analysis is retried on the next call."""
+    provider, completions = make_provider("not json", '{"keywords": ["rust"]}')
+
+    fallback = await provider.process_query("rust news")
+    result = await provider.process_query("rust news")
+
+    assert fallback["keywords"] == ["rust", "news"]
+    assert result == {"keywords": ["rust"]}
+    assert len(completions.calls) == 2
+
+
+async def test_process_query_coalesces_concurrent_requests():
+    """Test that identical concurrent queries share one model call."""
+    provider, completions = make_provider('{"keywords": ["python"]}')
+
+    first, second = await asyncio.gather(
+        provider.process_query("python news"),
+        provider.process_query("python news"),
+    )
+    first["keywords"].append("mutated")
+
+    assert len(completions.calls) == 1
+    assert second == {"keywords": ["python"]}
+    assert provider._inflight == {}
+
+
+@pytest.mark.parametrize("content", [
+    '{"keywords": ["rust"]}',
+    'Here you go:\n```json\n{"keywords": ["rust"]}\n```\nDone.',
+    '```\n{"keywords": ["rust"]}\n```',
+    '```json\n{"keywords": ["rust"]}',
+])
+def test_parse_json_response_unwraps_code_fences(content):
+    """Test JSON extraction from bare, fenced and unterminated model output."""
+    assert _parse_json_response(content) == {"keywords": ["rust"]}
+
+
+async def test_summarize_and_sentiment_fills_prompt_template():
+    """Test that the prompt carries the query and truncated post content."""
+    provider, completions = make_provider('{"summary": "Likes {braces}", "sentiment": "Positive"}')
+
+    summary, sentiment = await provider.summarize_and_sentiment("{x} " + "a" * 2000, "rust")
+
+    user_prompt = completions.calls[0]["messages"][1]["content"]
+    assert 'User Query: "rust"' in user_prompt
+    assert 'Post Content: "{x} ' + "a" * 996 + '"' in user_prompt
+    assert (summary, sentiment) == ("Likes {braces}", "positive")
+
+
+async def test_rank_posts_relevance_scores_in_chunks():
+    """Test that large batches are split and a bad chunk only defaults itself."""
+    provider, completions = make_provider(", ".join(["0.9"] * 8), "0.1, oops", "0.3, 0.4")
+    posts = [{"content": f"post {i}"} for i in range(18)]
+
+    scores = await provider.rank_posts_relevance(posts, "rust")
+
+    assert len(completions.calls) == 3
+    assert scores == [0.9] * 8 + [0.5] * 8 + [0.3, 0.4]
+    assert [call["max_tokens"] for call in completions.calls] == [64, 64, 16]
+
+
+async def test_summarize_and_sentiment_batch_uses_one_call():
+    """Test that a batch of posts is summarized with a single model call."""
+    provider, completions = make_provider(
+        '[{"summary": "First", "sentiment": "Positive"}, {"summary": "", "sentiment": "mixed"}]'
+    )
+
+    results = await provider.summarize_and_sentiment_batch(["post one", "post two"], "rust")
+
+    assert len(completions.calls) == 1
+    assert "Post 2: post two" in completions.calls[0]["messages"][1]["content"]
+    assert results == [("First", "positive"), ("Summary unavailable", "neutral")]
+
+
+async def test_summarize_and_sentiment_batch_falls_back_per_post():
+    """Test that a reply not covering every post falls back to one call per post."""
+    provider, completions = make_provider(
+        '[{"summary": "Only one", "sentiment": "positive"}]',
+        '{"summary": "One", "sentiment": "negative"}',
+        '{"summary": "Two", "sentiment": "neutral"}',
+    )
+
+    results = await provider.summarize_and_sentiment_batch(["post one", "post two"], "rust")
+
+    assert len(completions.calls) == 3
+    assert results == [("One", "negative"), ("Two", "neutral")]
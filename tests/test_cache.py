@@ -0,0 +1,137 @@
+"""
+Tests for caching utilities.
+"""
+
+import asyncio
+
+from src.utils.cache import LRUCache, QueryCache, SearchCache, SemanticQueryCache
+
+
+def test_semantic_cache_hits_similar_embeddings():
+    """Test that a nearby embedding returns the cached analysis."""
+    cache = SemanticQueryCache(threshold=0.9)
+    cache.set("trending ai posts", [1.0, 0.0, 0.1], {"keywords": ["ai"]})
+
+    assert cache.get([0.98, 0.02, 0.12]) == {"keywords": ["ai"]}
+    assert cache.get([0.0, 1.0, 0.0]) is None
+
+
+def test_semantic_cache_evicts_least_recently_used():
+    """Test that the least recently used entry is replaced when full."""
+    cache = SemanticQueryCache(max_size=2, threshold=0.99)
+    cache.set("a", [1.0, 0.0, 0.0], {"q": "a"})
+    cache.set("b", [0.0, 1.0, 0.0], {"q": "b"})
+    cache.get([1.0, 0.0, 0.0])
+    cache.set("c", [0.0, 0.0, 1.0], {"q": "c"})
+
+    assert cache.get([1.0, 0.0, 0.0]) == {"q": "a"}
+    assert cache.get([0.0, 1.0, 0.0]) is None
+    assert cache.get([0.0, 0.0, 1.0]) == {"q": "c"}
+
+
+async def test_search_cache_shares_fetches_and_copies_results():
+    """Test that concurrent and repeated searches run one fetch."""
+    cache = SearchCache()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0)
+        return [{"id": "1"}]
+
+    first, second = await asyncio.gather(cache.get_or_fetch("k", fetch), cache.get_or_fetch("k", fetch))
+    first[0]["id"] = "mutated"
+    third = await cache.get_or_fetch("k", fetch)
+
+    assert len(calls) == 1
+    assert second == third == [{"id": "1"}]
+
+
+async def test_search_cache_does_not_keep_empty_results():
+    """Test that an empty result is fetched again next time."""
+    cache = SearchCache()
+    results = [[], [{"id": "1"}]]
+
+    async def fetch():
+        return results.pop(0)
+
+    assert await cache.get_or_fetch("k", fetch) == []
+    assert await cache.get_or_fetch("k", fetch) == [{"id": "1"}]
+
+
+def test_lru_cache_key_ignores_kwarg_order():
+    """Test that generated keys are stable across keyword order and distinguish arguments."""
+    cache = LRUCache()
+
+    key = cache._generate_key("rust", {1: "a"}, limit=5, sort="new")
+
+    assert key == cache._generate_key("rust", {1: "a"}, sort="new", limit=5)
+    assert key != cache._generate_key("rust", {1: "a"}, sort="new", limit=6)
+    assert len(key) == 32
+
+
+def test_lru_cache_expires_and_evicts(monkeypatch):
+    """Test TTL expiry and least-recently-used eviction."""
+    now = [1000.0]
+    monkeypatch.setattr("src.utils.cache.time.time", lambda: now[0])
+    cache = LRUCache(max_size=2, ttl_seconds=10)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get_stats()["oldest_entry"] == 1000.0
+
+    now[0] = 1011.0
+    assert cache.get("a") is None
+    assert cache.cleanup_expired() == 1
+    assert list(cache.cache) == []
+
+
+def test_query_cache_normalizes_case_punctuation_and_spacing():
+    """Test that trivially different spellings of a query share one key."""
+    cache = QueryCache()
+
+    assert cache._normalize_query("  What's NEW in Rust?! ") == "what's new in rust"
+    assert cache._normalize_query("rust . news") == "rust news"
+
+
+def test_query_cache_counts_hits_and_misses():
+    """Test that cached results are returned synchronously and counted."""
+    cache = QueryCache()
+
+    assert cache.get_cached_result("Rust news?") is None
+    cache.cache_result("rust news", {"final_response": "ok"})
+
+    assert cache.get_cached_result("Rust  NEWS?") == {"final_response": "ok"}
+    assert (cache.hit_count, cache.miss_count) == (1, 1)
+    assert cache.get_cache_stats()["hit_rate_percent"] == 50.0
+
+
+def test_lru_cache_cleanup_skips_refreshed_entries(monkeypatch):
+    """Test that cleanup removes only entries whose latest expiry has passed."""
+    now = [1000.0]
+    monkeypatch.setattr("src.utils.cache.time.time", lambda: now[0])
+    cache = LRUCache(ttl_seconds=10)
+
+    cache.set("stale", 1)
+    cache.set("refreshed", 2)
+    now[0] = 1005.0
+    cache.set("refreshed", 3)
+    now[0] = 1011.0
+
+    assert cache.cleanup_expired() == 1
+    assert cache.get("refreshed") == 3
+    assert cache._expiry_heap == [(1015.0, "refreshed")]
+
+
+def test_lru_cache_expiry_heap_stays_bounded():
+    """Test that repeated refreshes do not grow the expiry heap without limit."""
+    cache = LRUCache(max_size=2)
+
+    for i in range(20):
+        cache.set("key", i)
+
+    assert len(cache._expiry_heap) <= 4
@@ -0,0 +1,27 @@
+"""
+Tests for the shared HTTP client.
+"""
+
+from src.providers.jina_provider import JinaProvider
+from src.providers.reddit_provider import RedditProvider
+from src.providers.twitter_provider import TwitterProvider
+from src.utils.http_client import close_shared_client, get_shared_client
+
+
+async def test_providers_share_one_http_client():
+    """Test that providers reuse the pooled client and pick up a replacement after it closes."""
+    reddit = RedditProvider()
+    other = RedditProvider()
+    twitter = TwitterProvider(serper_api_key="test_key")
+    jina = JinaProvider(api_key="test_key")
+
+    assert reddit.client is other.client is twitter.client is jina.client
+    assert "User-Agent" in reddit.headers
+    assert twitter.serper_headers["X-API-KEY"] == "test_key"
+    assert jina.headers["Authorization"] == "Bearer test_key"
+
+    closed = reddit.client
+    await close_shared_client()
+    assert closed.is_closed
+    assert reddit.client is jina.client is get_shared_client()
+    assert reddit.client is not closed and not reddit.client.is_closed
@@ -0,0 +1,141 @@
+"""
+Tests for the Jina AI provider.
+"""
+
+from datetime import datetime
+
+import httpx
+import numpy as np
+import orjson
+import pytest
+
+from src.models.post import Post
+from src.providers.jina_provider import JinaProvider, _relevance_scores, process_posts_with_jina
+
+
+def make_post(post_id: str, content: str) -> Post:
+    """Create a post with sensible defaults for testing."""
+    return Post(
+        id=post_id,
+        source="Reddit",
+        content=content,
+        author="u/tester",
+        created_at=datetime.now(),
+        url=f"https://example.com/{post_id}",
+        engagement_score=1.0
+    )
+
+
+def test_relevance_scores_map_cosine_to_unit_range():
+    """Test cosine scoring, including zero vectors."""
+    scores = _relevance_scores([1.0, 0.0], [[2.0, 0.0], [0.0, 3.0], [-1.0, 0.0], [0.0, 0.0]])
+
+    assert scores.tolist() == pytest.approx([1.0, 0.5, 0.0, 0.0])
+
+
+async def test_rank_posts_by_relevance_orders_by_similarity():
+    """Test that posts are scored against the query and sorted."""
+    provider = JinaProvider(api_key="test_key")
+
+    async def fake_embeddings(texts, model="jina-embeddings-v3"):
+        vectors = {"query": [1.0, 0.0], "close": [0.9, 0.1], "far": [0.0, 1.0]}
+        return [vectors[text] for text in texts]
+
+    provider.get_embeddings = fake_embeddings
+    posts = [make_post("far", "far"), make_post("close", "close")]
+
+    ranked = await provider.rank_posts_by_relevance(posts, "query")
+
+    assert [p.id for p in ranked] == ["close", "far"]
+    assert ranked[0].jina_relevance_score > ranked[1].jina_relevance_score
+
+
+async def test_process_posts_with_jina_embeds_once():
+    """Test that batch processing makes one embedding request and annotates posts."""
+    provider = JinaProvider(api_key="test_key")
+    requests = []
+
+    async def fake_embeddings(texts, model="jina-embeddings-v3"):
+        requests.append(texts)
+        return [[1.0, float(i)] for i in range(len(texts))]
+
+    provider.get_embeddings = fake_embeddings
+    posts = [make_post(str(i), f"python tooling discussion number {i}") for i in range(5)]
+
+    processed = await process_posts_with_jina(posts, "python tooling", provider)
+
+    assert len(requests) == 1
+    assert len(processed) == 5
+    for post in processed:
+        assert post.jina_metadata["processed_by_jina"] is True
+        assert post.jina_metadata["relevance_score"] == post.jina_relevance_score
+        assert "python" in post.jina_metadata["extracted_keywords"]
+
+
+async def test_rank_posts_by_relevance_reuses_post_embeddings():
+    """Test that reranking only embeds posts that were not seen before."""
+    provider = JinaProvider(api_key="test_key")
+    requests = []
+
+    async def fake_embeddings(texts, model="jina-embeddings-v3"):
+        requests.append(texts)
+        vectors = {"query": [1.0, 0.0], "close": [3.0, 0.3], "far": [0.0, 2.0], "new": [1.0, 1.0]}
+        return [vectors[text] for text in texts]
+
+    provider.get_embeddings = fake_embeddings
+    await provider.rank_posts_by_relevance([make_post("far", "far"), make_post("close", "close")], "query")
+
+    posts = [make_post("new", "new"), make_post("far", "far"), make_post("close", "close")]
+    ranked = await provider.rank_posts_by_relevance(posts, "query")
+
+    assert requests[1] == ["query", "new"]
+    assert [p.id for p in ranked] == ["close", "new", "far"]
+
+
+async def test_get_embeddings_returns_float32_matrix(monkeypatch):
+    """Test that embeddings come back as one float32 row per text."""
+    provider = JinaProvider(api_key="test_key")
+
+    def handler(request):
+        assert orjson.loads(request.content)["input"] == ["a", "b"]
+        assert request.headers["Authorization"] == "Bearer test_key"
+        return httpx.Response(200, json={"data": [{"embedding": [0.5, 1.0]}, {"embedding": [0.0, 2.0]}]})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr("src.providers.jina_provider.get_shared_client", lambda: client)
+
+    embeddings = await provider.get_embeddings(["a", "b"])
+
+    assert embeddings.dtype == np.float32
+    assert embeddings.tolist() == [[0.5, 1.0], [0.0, 2.0]]
+
+
+def test_simple_keyword_extraction_orders_by_frequency():
+    """Test that keywords are ranked by count, ties kept in first-seen order."""
+    provider = JinaProvider(api_key="test_key")
+
+    keywords = provider._simple_keyword_extraction(
+        "Rust async runtime: tokio versus smol. Tokio wins; rust async rust", 3
+    )
+
+    assert keywords == ["rust", "async", "tokio"]
+
+
+async def test_degenerate_inputs_skip_embedding_requests():
+    """Test that trivial similarity and ranking inputs make no requests."""
+    provider = JinaProvider(api_key="test_key")
+
+    async def fail_embeddings(texts, model="jina-embeddings-v3"):
+        raise AssertionError("unexpected embedding request")
+
+    provider.get_embeddings = fail_embeddings
+    post = make_post("only", "the only post")
+
+    assert await provider.calculate_similarity("same text", "same text") == 1.0
+    assert await provider.calculate_similarity("", "other text") == 0.0
+    assert await provider.rank_posts_by_relevance([post], "query") == [post]
+    assert post.jina_relevance_score == 1.0
+
+    post.jina_metadata.update({"processed_by_jina": True, "query": "query"})
+    assert await provider.enhance_post_content(post, "query") is post
+    assert post.jina_relevance_score == 1.0
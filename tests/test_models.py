@@ -0,0 +1,76 @@
+"""
+Tests for data models.
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.models.post import Post
+
+
+def make_post(**overrides) -> Post:
+    """Create a post with sensible defaults for testing."""
+    data = {
+        "id": "abc",
+        "source": "Reddit",
+        "content": "Some post content",
+        "author": "u/tester",
+        "created_at": datetime(2024, 1, 2, 3, 4, 5),
+        "url": "https://reddit.com/r/test/abc",
+        "engagement_score": 12.5,
+    }
+    data.update(overrides)
+    return Post(**data)
+
+
+def test_post_uses_slots():
+    """Test that posts reject attributes that are not declared fields."""
+    post = make_post()
+
+    assert not hasattr(post, "__dict__")
+    with pytest.raises(AttributeError):
+        post.undeclared_attribute = 1
+
+
+def test_post_round_trips_through_dict():
+    """Test that to_dict and from_dict are inverses."""
+    post = make_post(summary="A summary", sentiment="positive", relevance_score=0.7)
+
+    restored = Post.from_dict(post.to_dict())
+
+    assert restored == post
+
+
+def test_to_dict_reuses_iso_timestamp():
+    """Test that the created_at string is formatted once and reused."""
+    post = make_post()
+
+    first = post.to_dict()["created_at"]
+    second = post.to_dict()["created_at"]
+
+    assert first == "2024-01-02T03:04:05"
+    assert first is second
+
+
+def test_get_time_display_buckets():
+    """Test relative time formatting against a fixed reference time."""
+    post = make_post()
+    created = post.created_at
+
+    assert post.get_time_display(now=created + timedelta(seconds=30)) == "Just now"
+    assert post.get_time_display(now=created + timedelta(minutes=5)) == "5m ago"
+    assert post.get_time_display(now=created + timedelta(hours=3, minutes=10)) == "3h ago"
+    assert post.get_time_display(now=created + timedelta(days=2, hours=1)) == "2d ago"
+
+
+def test_to_json_bytes_matches_to_dict():
+    """Test that JSON bytes carry the same values as to_dict."""
+    post = make_post(summary="A summary")
+
+    decoded = json.loads(post.to_json_bytes())
+
+    for key, value in post.to_dict().items():
+        assert decoded[key] == value
+    assert "_iso" not in decoded
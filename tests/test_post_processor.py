@@ -0,0 +1,156 @@
+"""
+Tests for post processing.
+"""
+
+from datetime import datetime
+
+from src.models.post import Post
+from src.processors.post_processor import PostProcessor
+
+
+def make_post(post_id: str, content: str, engagement_score: float = 10.0, source: str = "Reddit") -> Post:
+    """Create a post with sensible defaults for testing."""
+    return Post(
+        id=post_id,
+        source=source,
+        content=content,
+        author="u/tester",
+        created_at=datetime.now(),
+        url=f"https://example.com/{post_id}",
+        engagement_score=engagement_score
+    )
+
+
+def test_normalize_content_strips_urls_and_tags():
+    """Test that URLs, mentions and hashtags are ignored for comparison."""
+    processor = PostProcessor(ai_provider=None)
+
+    normalized = processor._normalize_content(
+        "Check  this out https://example.com/a?b=1 @someone #Python  NOW"
+    )
+
+    assert normalized == "check this out now"
+
+
+def test_dedup_and_filter_ignores_links_and_case():
+    """Test that posts differing only by links and case are deduplicated."""
+    processor = PostProcessor(ai_provider=None)
+    posts = [
+        make_post("1", "Python 3.12 is out with great new features https://a.com"),
+        make_post("2", "python 3.12 is OUT with great new features https://b.com"),
+        make_post("3", "Rust 2024 edition has been stabilized today"),
+    ]
+
+    unique = processor._dedup_and_filter(posts)
+
+    assert [p.id for p in unique] == ["1", "3"]
+
+
+def test_rank_posts_orders_by_score():
+    """Test that ranking assigns scores and sorts posts by them."""
+    processor = PostProcessor(ai_provider=None)
+    low = make_post("low", "short text here", engagement_score=1.0, source="Twitter")
+    high = make_post("high", "x" * 500, engagement_score=100.0)
+    high.sentiment = "positive"
+
+    ranked = processor._rank_posts([low, high])
+
+    assert [p.id for p in ranked] == ["high", "low"]
+    assert high.relevance_score > low.relevance_score
+    assert isinstance(high.relevance_score, float)
+
+
+class FakeAIProvider:
+    """AI provider stub that records calls instead of hitting the network."""
+
+    def __init__(self):
+        self.summarized = []
+        self.batches = []
+
+    async def summarize_and_sentiment(self, content: str, query: str):
+        self.summarized.append(content)
+        return f"summary of {content[:10]}", "positive"
+
+    async def summarize_and_sentiment_batch(self, contents, query: str):
+        self.batches.append(len(contents))
+        return [await self.summarize_and_sentiment(content, query) for content in contents]
+
+
+async def test_enhance_posts_parallel_preserves_order():
+    """Test that enhanced posts come back in their original order, summarized in batches."""
+    ai_provider = FakeAIProvider()
+    processor = PostProcessor(ai_provider=ai_provider)
+    posts = [make_post(str(i), f"post number {i} with enough words") for i in range(12)]
+
+    enhanced = await processor._enhance_posts_parallel(posts, "query")
+
+    assert [p.id for p in enhanced] == [str(i) for i in range(12)]
+    assert all(p.sentiment == "positive" and p.summary for p in enhanced)
+    assert ai_provider.batches == [8, 4]
+
+
+async def test_enhance_posts_reuses_cached_analysis():
+    """Test that posts with the same normalized content share one AI call."""
+    ai_provider = FakeAIProvider()
+    processor = PostProcessor(ai_provider=ai_provider)
+    first = make_post("1", "Same story here https://a.com")
+    second = make_post("2", "same STORY here https://b.com")
+    third = make_post("3", "Same story HERE")
+
+    await processor._enhance_posts_parallel([first, second], "query")
+    await processor._enhance_posts_parallel([third], "query")
+
+    assert len(ai_provider.summarized) == 1
+    assert second.summary == first.summary == third.summary
+    assert second.sentiment == first.sentiment == third.sentiment
+
+
+async def test_prefetch_enhancements_feeds_process_posts():
+    """Test that posts analyzed ahead of time are not sent to the AI again."""
+    ai_provider = FakeAIProvider()
+    processor = PostProcessor(ai_provider=ai_provider)
+    reddit = [make_post("r1", "Reddit thread about the new async runtime")]
+    twitter = [make_post("t1", "Tweet about the new async runtime release", source="Twitter")]
+
+    await processor.prefetch_enhancements(reddit, "query")
+    processed = await processor.process_posts(reddit + twitter, "query")
+
+    assert ai_provider.summarized == [reddit[0].content, twitter[0].content]
+    assert all(p.summary for p in processed)
+
+
+def test_dedup_and_filter_requires_real_words():
+    """Test that posts made mostly of links and tags are filtered out."""
+    processor = PostProcessor(ai_provider=None)
+    posts = [
+        make_post("spam", "#deal #sale @shop https://a.com https://b.com buy now"),
+        make_post("good", "This library finally makes async code readable for me"),
+        make_post("negative", "This library finally makes async code readable", engagement_score=-1),
+    ]
+
+    assert [p.id for p in processor._dedup_and_filter(posts)] == ["good"]
+
+
+def test_dedup_and_filter_keeps_first_quality_copy():
+    """Test that a rejected post does not hide a later quality duplicate."""
+    processor = PostProcessor(ai_provider=None)
+    posts = [
+        make_post("negative", "Python 3.12 is out with great new features", engagement_score=-1),
+        make_post("good", "python 3.12 is out with great new features"),
+        make_post("dupe", "Python 3.12 is OUT with great new features https://a.com"),
+        make_post("spam", "#deal #sale @shop https://a.com buy now please"),
+    ]
+
+    assert [p.id for p in processor._dedup_and_filter(posts)] == ["good"]
+
+
+def test_dedup_and_filter_catches_near_duplicates():
+    """Test that a lightly edited repost is treated as a duplicate."""
+    processor = PostProcessor(ai_provider=None)
+    posts = [
+        make_post("1", "New release: faster startup, better errors and improved typing for everyone"),
+        make_post("2", "New release - faster startup, better errors and improved typing for everyone!! 🎉"),
+        make_post("3", "Completely unrelated discussion about mechanical keyboards and switches"),
+    ]
+
+    assert [p.id for p in processor._dedup_and_filter(posts)] == ["1", "3"]
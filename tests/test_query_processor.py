@@ -0,0 +1,105 @@
+"""
+Tests for query processing.
+"""
+
+import pytest
+
+from src.processors.query_processor import QueryProcessor
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("What do people FEEL about the new iPhone?", "sentiment_analysis"),
+    ("trending posts about Rust", "trending_content"),
+    ("latest news on trending AI", "trending_content"),
+    ("debate over tabs vs spaces", "discussion_search"),
+    ("recent updates to Python", "news_search"),
+    ("python packaging", "general_search"),
+])
+def test_detect_query_type(query, expected):
+    """Test query type detection and its priority order."""
+    processor = QueryProcessor(ai_provider=None)
+
+    assert processor.detect_query_type(query) == expected
+
+
+@pytest.mark.parametrize("query, reddit, twitter", [
+    ("python tips on r/learnpython subreddit", True, False),
+    ("what are people tweeting about rust", False, True),
+    ("reddit and twitter takes on rust", True, True),
+    ("rust async runtimes", True, True),
+])
+def test_fallback_processing_detects_platforms(query, reddit, twitter):
+    """Test platform detection in fallback processing."""
+    processor = QueryProcessor(ai_provider=None)
+
+    result = processor._fallback_processing(query)
+
+    assert (result.search_reddit, result.search_twitter) == (reddit, twitter)
+
+
+def test_fallback_processing_extracts_keywords_and_subreddit():
+    """Test keyword and subreddit extraction in fallback processing."""
+    processor = QueryProcessor(ai_provider=None)
+
+    result = processor._fallback_processing("Best Rust crates on r/rust")
+
+    assert result.keywords == ["best", "rust", "crates", "r/rust"]
+    assert result.filters == {"time_range": "week", "sentiment": "any", "subreddit": "rust"}
+
+
+def test_extract_keywords_drops_stopwords():
+    """Test that short and common words are removed from AI keywords."""
+    processor = QueryProcessor(ai_provider=None)
+
+    keywords = processor._extract_keywords(["The", "python", "with", "these", "asyncio"], "query")
+
+    assert keywords == ["python", "asyncio"]
+
+
+def test_build_filters_validates_values():
+    """Test that unknown filter values fall back to defaults."""
+    processor = QueryProcessor(ai_provider=None)
+
+    assert processor._build_filters({"subreddit": "r/python", "time_range": "month"}) == {
+        "time_range": "month", "sentiment": "any", "subreddit": "python"
+    }
+    assert processor._build_filters({"subreddit": ["x"], "time_range": "decade", "sentiment_filter": "angry"}) == {
+        "time_range": "week", "sentiment": "any"
+    }
+
+
+class FakeAIProvider:
+    """AI provider stub that records analyzed queries."""
+
+    def __init__(self, analysis):
+        self.analysis = analysis
+        self.queries = []
+
+    async def process_query(self, query: str):
+        self.queries.append(query)
+        return dict(self.analysis)
+
+
+async def test_process_query_caches_by_normalized_prompt():
+    """Test that a repeated prompt skips analysis and gets its own copy."""
+    ai_provider = FakeAIProvider({"keywords": ["rust", "crates"], "time_range": "month"})
+    processor = QueryProcessor(ai_provider=ai_provider)
+
+    first = await processor.process_query("Rust crates")
+    first.keywords.append("mutated")
+    second = await processor.process_query("  rust   CRATES ")
+
+    assert ai_provider.queries == ["Rust crates"]
+    assert second.keywords == ["rust", "crates"]
+    assert second.original_query == "  rust   CRATES "
+
+
+async def test_process_query_does_not_cache_fallback():
+    """Test that a fallback analysis is retried on the next request."""
+    ai_provider = FakeAIProvider({"keywords": ["rust"], "fallback": True})
+    processor = QueryProcessor(ai_provider=ai_provider)
+
+    await processor.process_query("rust crates")
+    await processor.process_query("rust crates")
+
+    assert len(ai_provider.queries) == 2
@@ -0,0 +1,75 @@
+"""
+Tests for the Reddit provider.
+"""
+
+from datetime import datetime
+
+import httpx
+
+from src.providers.reddit_provider import RedditProvider
+
+
+def test_get_time_filter_uses_time_range_window():
+    """Test the start timestamp for known and unknown time ranges."""
+    provider = RedditProvider()
+    now = datetime(2024, 3, 31, 12, 0)
+
+    assert provider._get_time_filter("day", now) == int(datetime(2024, 3, 30, 12, 0).timestamp())
+    assert provider._get_time_filter("month", now) == int(datetime(2024, 3, 1, 12, 0).timestamp())
+    assert provider._get_time_filter("decade", now) == int(datetime(2024, 3, 24, 12, 0).timestamp())
+
+
+async def test_search_posts_parses_listing(monkeypatch):
+    """Test that a Reddit search listing becomes posts above the score threshold."""
+    provider = RedditProvider(max_results=5)
+    children = [
+        {"data": {"id": "a", "title": "Async Python tips", "selftext": "Use TaskGroup", "score": 10,
+                  "num_comments": 4, "author": "alice", "created_utc": 1700000000, "permalink": "/r/python/a"}},
+        {"data": {"id": "b", "title": "Low scoring post here", "score": 0, "created_utc": 1700000000}},
+    ]
+
+    def handler(request):
+        assert dict(request.url.params) == {"sort": "relevance", "limit": "5", "q": "async python", "t": "week"}
+        assert request.url.path == "/search.json"
+        assert request.headers["User-Agent"].startswith("SentientEcho")
+        return httpx.Response(200, json={"data": {"children": children}})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr("src.providers.reddit_provider.get_shared_client", lambda: client)
+
+    posts = await provider.search_posts(["async", "python"])
+
+    assert [p.id for p in posts] == ["a"]
+    assert posts[0].engagement_score == 12.0
+    assert posts[0].url == "https://reddit.com/r/python/a"
+
+
+def test_parse_reddit_post_skips_empty_and_short_posts():
+    """Test that posts without meaningful text are dropped."""
+    provider = RedditProvider()
+
+    assert provider._parse_reddit_post({"id": "a", "score": 5}) is None
+    assert provider._parse_reddit_post({"id": "b", "title": "  hi  ", "selftext": " "}) is None
+
+
+def test_parse_reddit_post_applies_min_score():
+    """Test that posts below the score threshold are dropped."""
+    provider = RedditProvider()
+    item = {"id": "d", "title": "A title long enough", "score": 4}
+
+    assert provider._parse_reddit_post(item, min_score=5) is None
+    assert provider._parse_reddit_post(item, min_score=4).metadata["score"] == 4
+
+
+def test_parse_reddit_post_tolerates_null_fields():
+    """Test that null numeric and text fields fall back to defaults."""
+    provider = RedditProvider()
+
+    post = provider._parse_reddit_post({
+        "id": "c", "title": "A title long enough", "selftext": None, "score": None,
+        "num_comments": "3", "author": None, "created_utc": None,
+    })
+
+    assert post.author == "u/unknown"
+    assert post.engagement_score == 1.5
+    assert post.metadata["score"] == 0
@@ -0,0 +1,172 @@
+"""
+Tests for the server rate limiter, response handler and endpoints.
+"""
+
+from collections import deque
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("sentient_agent_framework")
+
+from fastapi.testclient import TestClient
+
+from src import server as server_module
+from src.server import EnhancedSentientServer, RateLimiter, StreamingResponseHandler
+from src.utils.security import SecurityMonitor
+
+
+def test_rate_limiter_blocks_after_limit(monkeypatch):
+    """Test that requests beyond the endpoint limit are rejected within a window."""
+    limiter = RateLimiter()
+    monkeypatch.setattr("src.server.time.time", lambda: 600.0)
+
+    allowed = [limiter.is_allowed("client", "/metrics") for _ in range(11)]
+
+    assert allowed == [True] * 10 + [False]
+    assert limiter.is_allowed("other", "/metrics")
+    assert limiter.get_reset_time("client", "/metrics") == 60
+
+
+def test_rate_limiter_weights_previous_window(monkeypatch):
+    """Test that the previous window's count decays as the new window progresses."""
+    limiter = RateLimiter()
+    now = [600.0]
+    monkeypatch.setattr("src.server.time.time", lambda: now[0])
+    for _ in range(10):
+        limiter.is_allowed("client", "/metrics")
+
+    now[0] = 690.0  # halfway through the next window: 10 * 0.5 = 5 requests still count
+    allowed = [limiter.is_allowed("client", "/metrics") for _ in range(6)]
+
+    assert allowed == [True] * 5 + [False]
+    assert limiter.counters["client:/metrics"] == (11, 5, 10)
+
+    now[0] = 790.0  # two windows later nothing carries over
+    assert limiter.is_allowed("client", "/metrics")
+    assert limiter.counters["client:/metrics"] == (13, 1, 0)
+
+
+def test_rate_limiter_evicts_least_recent_clients():
+    """Test that tracked keys are capped, dropping the least recently seen."""
+    limiter = RateLimiter(max_keys=2)
+
+    for client in ("a", "b", "a", "c"):
+        limiter.is_allowed(client)
+
+    assert list(limiter.counters) == ["a", "c"]
+
+
+def test_rate_limiter_accepts_pre_resolved_limits(monkeypatch):
+    """Test that limits passed by the caller override the endpoint lookup."""
+    limiter = RateLimiter()
+    monkeypatch.setattr("src.server.time.time", lambda: 600.0)
+
+    allowed = [limiter.is_allowed("client", "/assist", (2, 60)) for _ in range(3)]
+
+    assert limiter._limits("/assist") == (30, 60)
+    assert limiter._limits("/unknown") == (60, 60)
+    assert allowed == [True, True, False]
+
+
+async def test_streaming_handler_materializes_events(monkeypatch):
+    """Test that column-recorded events come back as per-type dicts in order."""
+    monkeypatch.setattr("src.server.time.time", lambda: 5.0)
+    handler = StreamingResponseHandler()
+
+    await handler.emit_text_block("STATUS", "working")
+    await handler.emit_json("POSTS", {"count": 2})
+    await handler.emit_error("ERROR", "E1", {"reason": "x"})
+    stream = handler.create_text_stream("FINAL")
+    await stream.emit_chunk("Hello, ")
+    await stream.emit_chunk("world")
+    await stream.complete()
+
+    assert handler.final_response == "Hello, world"
+    assert handler.events == [
+        {"type": "text_block", "event_type": "STATUS", "content": "working", "timestamp": 5.0},
+        {"type": "json", "event_type": "POSTS", "data": {"count": 2}, "timestamp": 5.0},
+        {"type": "error", "event_type": "ERROR", "error_code": "E1", "details": {"reason": "x"}, "timestamp": 5.0},
+        {"type": "text_stream", "event_type": "FINAL", "content": "Hello, world", "timestamp": 5.0},
+    ]
+
+
+async def test_streaming_handler_keeps_most_recent_events():
+    """Test that the handler evicts the oldest events beyond its capacity."""
+    handler = StreamingResponseHandler(max_events=2)
+
+    await handler.emit_text_block("A", "first")
+    await handler.emit_text_block("B", "second")
+    assert not handler.truncated
+
+    await handler.emit_json("C", {"n": 3})
+
+    assert handler.truncated
+    assert [event["event_type"] for event in handler.events] == ["B", "C"]
+
+
+async def test_streaming_handler_reset_clears_state():
+    """Test that a reset handler is indistinguishable from a new one."""
+    handler = StreamingResponseHandler(max_events=1)
+    await handler.emit_text_block("A", "first")
+    await handler.emit_text_block("B", "second")
+    await handler.complete()
+
+    handler.reset()
+
+    assert handler.events == []
+    assert (handler.final_response, handler.completed, handler.truncated) == ("", False, False)
+
+
+class EchoAgent:
+    """Agent stub that emits the prompt back as a single event."""
+
+    async def assist(self, session, query, response_handler):
+        await response_handler.emit_text_block("ECHO", query.prompt)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Test client for a server with the framework and global state stubbed out."""
+    for name in ("FIREWORKS_API_KEY", "FIREWORKS_MODEL_ID", "SERPER_API_KEY", "JINA_AI_API_KEY"):
+        monkeypatch.setenv(name, "test")
+    monkeypatch.setattr(server_module, "DefaultServer", lambda agent: SimpleNamespace())
+    monkeypatch.setattr(server_module, "Session", lambda **kwargs: SimpleNamespace(**kwargs))
+    monkeypatch.setattr(server_module, "Query", lambda **kwargs: SimpleNamespace(**kwargs))
+    monkeypatch.setattr(server_module, "security_monitor", SecurityMonitor())
+    monkeypatch.setattr(server_module, "_HANDLER_POOL", deque(maxlen=256))
+    return TestClient(EnhancedSentientServer(EchoAgent()).app)
+
+
+@pytest.mark.parametrize("body", [b"{not json", b'["python news"]', b'{"query": "python news"}'])
+def test_assist_rejects_invalid_bodies(client, body):
+    """Test that malformed or mis-shaped bodies are rejected with 400."""
+    response = client.post("/assist", content=body)
+
+    assert response.status_code == 400
+    assert response.json()["detail"]["error"] == "Invalid request"
+
+
+def test_assist_pooled_handler_does_not_leak_events(client):
+    """Test that a reused response handler starts each request empty."""
+    first = client.post("/assist", json={"query": {"prompt": "python news"}})
+    second = client.post("/assist", json={"query": {"prompt": "rust news"}})
+
+    assert first.status_code == second.status_code == 200
+    assert [event["content"] for event in second.json()["events"]] == ["rust news"]
+    assert len(server_module._HANDLER_POOL) == 1
+
+
+def test_metrics_honors_if_none_match(client):
+    """Test that a matching ETag is answered with 304 and no body."""
+    response = client.get("/metrics")
+    etag = response.headers["ETag"]
+
+    not_modified = client.get("/metrics", headers={"If-None-Match": etag})
+    stale = client.get("/metrics", headers={"If-None-Match": '"stale"'})
+
+    assert response.status_code == 200
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert stale.status_code == 200
+    assert stale.headers["ETag"] == etag
@@ -0,0 +1,94 @@
+"""
+Tests for the Twitter provider.
+"""
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from src.providers import twitter_provider
+from src.providers.twitter_provider import TwitterProvider
+
+
+def test_get_since_date_uses_time_range_window():
+    """Test the snscrape since date for known and unknown time ranges."""
+    provider = TwitterProvider()
+    now = datetime(2024, 3, 31, 12, 0)
+
+    assert provider._get_since_date("year", now) == "2023-04-01"
+    assert provider._get_since_date("week", now) == "2024-03-24"
+    assert provider._get_since_date("", now) == "2024-03-24"
+
+
+def make_tweet(tweet_id: int, content: str = "Python 3.13 is out today", likes: int = 3):
+    """Create an object shaped like an snscrape Tweet."""
+    return SimpleNamespace(
+        id=tweet_id,
+        rawContent=content,
+        likeCount=likes,
+        retweetCount=1,
+        replyCount=2,
+        date=datetime(2024, 10, 7, 12, 0, tzinfo=timezone.utc),
+        url=f"https://twitter.com/py/status/{tweet_id}",
+        user=SimpleNamespace(username="py", followersCount=10, verified=None),
+    )
+
+
+class FakeScraper:
+    """snscrape scraper stub yielding canned tweets and recording its target."""
+
+    targets = []
+    tweets = []
+
+    def __init__(self, target: str):
+        self.targets.append(target)
+
+    def get_items(self):
+        yield from self.tweets
+
+
+async def test_search_with_snscrape_parses_tweets(monkeypatch):
+    """Test that scraped tweets become posts, skipping retweets and unpopular tweets."""
+    monkeypatch.setattr(twitter_provider, "SNSCRAPE_AVAILABLE", True)
+    monkeypatch.setattr(twitter_provider, "TwitterSearchScraper", FakeScraper)
+    FakeScraper.targets = []
+    FakeScraper.tweets = [
+        make_tweet(1), make_tweet(2, "RT @py: Python 3.13 is out"), make_tweet(3, likes=2), make_tweet(4), make_tweet(5),
+    ]
+    provider = TwitterProvider(max_results=4)
+
+    posts = await provider._search_with_snscrape(["python"], min_likes=3)
+
+    assert [p.id for p in posts] == ["1", "4"]
+    assert posts[0].author == "@py"
+    assert posts[0].engagement_score == 8.0
+    assert posts[0].metadata["user_verified"] is False
+    assert FakeScraper.targets[0].startswith('"python" since:')
+    assert FakeScraper.targets[0].endswith("min_faves:3")
+
+
+async def test_scrape_without_snscrape_returns_nothing(monkeypatch):
+    """Test that a missing snscrape install degrades to no results."""
+    monkeypatch.setattr(twitter_provider, "SNSCRAPE_AVAILABLE", False)
+
+    assert await TwitterProvider().get_user_tweets("py") == []
+
+
+def test_parse_serper_result_extracts_author():
+    """Test username extraction from twitter.com and x.com links."""
+    provider = TwitterProvider()
+
+    def author_of(link):
+        post = provider._parse_serper_result({"title": "Some tweet title", "snippet": "text", "link": link})
+        return post.author if post else None
+
+    assert author_of("https://twitter.com/py/status/1") == "@py"
+    assert author_of("https://x.com/rustlang/status/2") == "@rustlang"
+    assert author_of("https://example.com/py/status/3") is None
+
+
+def test_parse_serper_result_skips_short_results():
+    """Test that results without meaningful text are dropped."""
+    provider = TwitterProvider()
+
+    assert provider._parse_serper_result({"title": "hi", "snippet": None, "link": "https://x.com/a/status/1"}) is None
+    assert provider._parse_serper_result({"title": "   ", "snippet": "      ", "link": "https://x.com/a"}) is None